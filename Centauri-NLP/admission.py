@@ -0,0 +1,200 @@
+import asyncio
+import json
+import math
+import os
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from tracing import span
+
+# Admission control: at most ADMISSION_MAX_CONCURRENCY requests run at once; the rest wait in
+# one bounded queue per lane. Interactive traffic (SeoController, SectionScorer's /similarity)
+# and bulk traffic (batch clients that send "X-Priority: bulk") get separate queues, freed slots
+# go to the lanes by weight, and bulk never holds every slot, so an interactive call waits for
+# at most one slot to free instead of behind every queued article. A full queue answers
+# 503 + Retry-After. bulk_score.py scores in its own processes and never passes through here.
+ADMISSION_ENABLED = os.environ.get("ADMISSION_ENABLED", "1") == "1"
+ADMISSION_MAX_CONCURRENCY = int(os.environ.get("ADMISSION_MAX_CONCURRENCY", str(max(2, os.cpu_count() or 2))))
+# Slots bulk requests may hold at once (default: all but one)
+ADMISSION_BULK_MAX_CONCURRENCY = int(os.environ.get("ADMISSION_BULK_MAX_CONCURRENCY", str(max(1, ADMISSION_MAX_CONCURRENCY - 1))))
+ADMISSION_INTERACTIVE_QUEUE = int(os.environ.get("ADMISSION_INTERACTIVE_QUEUE", "64"))
+ADMISSION_BULK_QUEUE = int(os.environ.get("ADMISSION_BULK_QUEUE", "16"))
+# Share of freed slots each lane gets while both are waiting
+ADMISSION_INTERACTIVE_WEIGHT = int(os.environ.get("ADMISSION_INTERACTIVE_WEIGHT", "4"))
+ADMISSION_BULK_WEIGHT = int(os.environ.get("ADMISSION_BULK_WEIGHT", "1"))
+# Requests are interactive unless they send "X-Priority: bulk" or match one of these
+# comma-separated route prefixes (none by default: bulk callers tag themselves)
+BULK_ROUTE_PREFIXES = tuple(
+    p.strip() for p in os.environ.get("ADMISSION_BULK_ROUTES", "").split(",") if p.strip()
+)
+PRIORITY_HEADER = b"x-priority"
+INTERACTIVE, BULK = "interactive", "bulk"
+# Recent waits kept per lane for the percentiles in metrics()
+WAIT_SAMPLES = 1000
+
+
+class _Lane:
+    def __init__(self, name: str, weight: int, max_queue: int, max_active: int):
+        self.name = name
+        self.weight = weight
+        self.max_queue = max_queue
+        self.max_active = max_active
+        self.waiters: "deque[asyncio.Future]" = deque()
+        self.active = 0
+        self.current = 0  # smooth weighted round-robin credit
+        self.admitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.service_seconds = 0.0
+        self.waits: "deque[float]" = deque(maxlen=WAIT_SAMPLES)
+
+    def eligible(self) -> bool:
+        return self.active < self.max_active
+
+
+class AdmissionController:
+    def __init__(self, max_concurrency: int = ADMISSION_MAX_CONCURRENCY):
+        self.max_concurrency = max_concurrency
+        self.active = 0
+        self.lanes = {
+            INTERACTIVE: _Lane(INTERACTIVE, ADMISSION_INTERACTIVE_WEIGHT, ADMISSION_INTERACTIVE_QUEUE, max_concurrency),
+            BULK: _Lane(BULK, ADMISSION_BULK_WEIGHT, ADMISSION_BULK_QUEUE, min(ADMISSION_BULK_MAX_CONCURRENCY, max_concurrency)),
+        }
+
+    def lane_for(self, scope) -> str:
+        for key, value in scope["headers"]:
+            if key == PRIORITY_HEADER:
+                value = value.decode("latin-1").strip().lower()
+                if value in self.lanes:
+                    return value
+        return BULK if BULK_ROUTE_PREFIXES and scope["path"].startswith(BULK_ROUTE_PREFIXES) else INTERACTIVE
+
+    # ----------- ACQUIRE / RELEASE -----------
+
+    async def acquire(self, name: str) -> bool:
+        """True once a slot is held; False when the lane's queue is full."""
+        lane = self.lanes[name]
+        if self.active < self.max_concurrency and lane.eligible() and not lane.waiters:
+            self._grant(lane)
+            lane.waits.append(0.0)
+            return True
+        if len(lane.waiters) >= lane.max_queue:
+            lane.rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        lane.waiters.append(waiter)
+        queued = time.perf_counter()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Client went away while queued; a slot granted in the meantime goes to the next one
+            if waiter.done() and not waiter.cancelled():
+                self.release(name, 0.0)
+            else:
+                lane.waiters.remove(waiter)
+            raise
+        lane.waits.append(time.perf_counter() - queued)
+        return True
+
+    def release(self, name: str, service_seconds: float):
+        lane = self.lanes[name]
+        lane.active -= 1
+        self.active -= 1
+        lane.completed += 1
+        lane.service_seconds += service_seconds
+        self._dispatch()
+
+    def _grant(self, lane: _Lane):
+        lane.active += 1
+        lane.admitted += 1
+        self.active += 1
+
+    def _dispatch(self):
+        while self.active < self.max_concurrency:
+            ready = [lane for lane in self.lanes.values() if lane.waiters and lane.eligible()]
+            if not ready:
+                return
+            # Smooth weighted round-robin over the lanes that have someone waiting
+            total = sum(lane.weight for lane in ready)
+            for lane in ready:
+                lane.current += lane.weight
+            lane = max(ready, key=lambda l: l.current)
+            lane.current -= total
+            waiter = lane.waiters.popleft()
+            if waiter.cancelled():
+                continue
+            self._grant(lane)
+            waiter.set_result(None)
+
+    # ----------- METRICS -----------
+
+    def retry_after(self, name: str) -> int:
+        """Seconds until the lane's queue has likely drained one slot's worth."""
+        lane = self.lanes[name]
+        average = lane.service_seconds / lane.completed if lane.completed else 1.0
+        return max(1, math.ceil(average * (len(lane.waiters) + 1) / max(1, lane.max_active)))
+
+    def metrics(self) -> Dict[str, Any]:
+        lanes = {}
+        for lane in self.lanes.values():
+            waits = sorted(lane.waits)
+            lanes[lane.name] = {
+                "queueDepth": len(lane.waiters),
+                "queueLimit": lane.max_queue,
+                "active": lane.active,
+                "maxActive": lane.max_active,
+                "weight": lane.weight,
+                "admitted": lane.admitted,
+                "rejected": lane.rejected,
+                "completed": lane.completed,
+                "waitMsP50": round(waits[len(waits) // 2] * 1000, 1) if waits else 0.0,
+                "waitMsP95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 1) if waits else 0.0,
+                "waitMsMax": round(waits[-1] * 1000, 1) if waits else 0.0,
+                "serviceMsAvg": round(lane.service_seconds / lane.completed * 1000, 1) if lane.completed else 0.0,
+            }
+        return {"enabled": ADMISSION_ENABLED, "maxConcurrency": self.max_concurrency, "active": self.active, "lanes": lanes}
+
+
+admission = AdmissionController()
+
+
+class AdmissionMiddleware:
+    """ASGI middleware in front of every non-GET HTTP request (status and metrics reads are
+    never queued). The slot is held until the response, streamed or not, has been sent."""
+
+    def __init__(self, app, controller: Optional[AdmissionController] = None, enabled: bool = ADMISSION_ENABLED):
+        self.app = app
+        self.controller = controller or admission
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS"):
+            await self.app(scope, receive, send)
+            return
+
+        lane = self.controller.lane_for(scope)
+        with span("queue"):
+            admitted = await self.controller.acquire(lane)
+        if not admitted:
+            await self.reject(send, lane)
+            return
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(lane, time.perf_counter() - start)
+
+    async def reject(self, send, lane: str):
+        body = json.dumps({"detail": f"Service busy: the {lane} queue is full", "lane": lane}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(self.controller.retry_after(lane)).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,90 @@
+import os
+from typing import List
+
+import numpy as np
+
+# Neighbour search for /get-subtopics. Headings from 50 SERP results run into the tens of
+# thousands, and an all-pairs similarity matrix is quadratic in memory. Below
+# SUBTOPIC_ANN_MIN_HEADINGS the exact search runs in row blocks (linear memory); above it a
+# random-projection LSH index proposes candidate pairs, and only candidates are scored.
+# Embeddings are expected to be unit length (normalize_embeddings=True), so dot = cosine.
+SUBTOPIC_ANN_MIN_HEADINGS = int(os.environ.get("SUBTOPIC_ANN_MIN_HEADINGS", "5000"))
+# Recall/speed trade-off: more tables raise recall, more bits per table make buckets smaller
+# (faster, lower recall). 16 x 5 finds ~97% of the pairs above 0.6 on bench_subtopics.py data.
+ANN_TABLES = int(os.environ.get("ANN_TABLES", "16"))
+ANN_BITS = int(os.environ.get("ANN_BITS", "5"))
+# Rows scored per matrix product (exact search, and inside oversized buckets)
+ANN_BLOCK_ROWS = 1024
+ANN_SEED = 13
+
+
+def _group_pairs(n: int, rows: np.ndarray, cols: np.ndarray) -> List[np.ndarray]:
+    """Pairs (i < j) -> for every i, its neighbours j in ascending order."""
+    keys = np.unique(rows.astype(np.int64) * n + cols)
+    rows, cols = keys // n, keys % n
+    bounds = np.searchsorted(rows, np.arange(n + 1))
+    return [cols[bounds[i]:bounds[i + 1]] for i in range(n)]
+
+
+def exact_neighbors(embeddings: np.ndarray, threshold: float, block_rows: int = ANN_BLOCK_ROWS) -> List[np.ndarray]:
+    """For every row i, the rows j > i with cosine > threshold."""
+    n = len(embeddings)
+    rows, cols = [], []
+    for start in range(0, n, block_rows):
+        scores = embeddings[start:start + block_rows] @ embeddings.T
+        i, j = np.nonzero(scores > threshold)
+        i += start
+        keep = j > i
+        rows.append(i[keep])
+        cols.append(j[keep])
+    if not rows:
+        return [np.empty(0, dtype=np.int64) for _ in range(n)]
+    return _group_pairs(n, np.concatenate(rows), np.concatenate(cols))
+
+
+class RandomProjectionLSH:
+    """Sign-of-random-hyperplane LSH (SimHash) over unit vectors. Two vectors at angle t share
+    a bucket in one table with probability (1 - t/pi) ** bits; a pair is a candidate if it
+    shares a bucket in any table."""
+
+    def __init__(self, embeddings: np.ndarray, tables: int = ANN_TABLES, bits: int = ANN_BITS, seed: int = ANN_SEED):
+        self.embeddings = embeddings
+        self.tables = tables
+        self.bits = bits
+        rng = np.random.default_rng(seed)
+        planes = rng.standard_normal((embeddings.shape[1], tables * bits)).astype(embeddings.dtype)
+        signs = (embeddings @ planes > 0).reshape(len(embeddings), tables, bits)
+        # One integer bucket code per row and table
+        self.codes = signs.astype(np.int64) @ (1 << np.arange(bits, dtype=np.int64))
+
+    def neighbors(self, threshold: float) -> List[np.ndarray]:
+        """Same contract as exact_neighbors(), restricted to candidate pairs."""
+        n = len(self.embeddings)
+        rows, cols = [], []
+        for t in range(self.tables):
+            order = np.argsort(self.codes[:, t], kind="stable")
+            sorted_codes = self.codes[order, t]
+            bounds = np.flatnonzero(np.diff(sorted_codes)) + 1
+            for bucket in np.split(order, bounds):
+                if len(bucket) < 2:
+                    continue
+                bucket = np.sort(bucket)
+                vectors = self.embeddings[bucket]
+                for start in range(0, len(bucket), ANN_BLOCK_ROWS):
+                    scores = vectors[start:start + ANN_BLOCK_ROWS] @ vectors.T
+                    i, j = np.nonzero(scores > threshold)
+                    i += start
+                    keep = j > i
+                    rows.append(bucket[i[keep]])
+                    cols.append(bucket[j[keep]])
+        if not rows:
+            return [np.empty(0, dtype=np.int64) for _ in range(n)]
+        return _group_pairs(n, np.concatenate(rows), np.concatenate(cols))
+
+
+def similar_headings(embeddings: np.ndarray, threshold: float, use_ann: bool = None) -> List[np.ndarray]:
+    if use_ann is None:
+        use_ann = len(embeddings) >= SUBTOPIC_ANN_MIN_HEADINGS
+    if use_ann:
+        return RandomProjectionLSH(embeddings).neighbors(threshold)
+    return exact_neighbors(embeddings, threshold)
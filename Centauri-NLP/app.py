@@ -1,15 +1,27 @@
 from fastapi import FastAPI
 from pydantic import BaseModel
 from typing import List
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+import os
+import queue
 import re
-import spacy
-import language_tool_python
+from importlib.metadata import version as package_version
+
+from grammar_cache import grammar_cache
+from model_registry import registry
 
 app = FastAPI(title="Centauri Sentence Tagger")
 
-# Load models (FREE & OPEN SOURCE)
-nlp = spacy.load("en_core_web_sm")
-grammar_tool = language_tool_python.LanguageTool("en-US")
+# Load models (FREE & OPEN SOURCE) through the shared registry.
+# The LanguageTool pool (LANGUAGETOOL_SERVERS) is pinned: the tool queue below holds it.
+nlp = registry.proxy("en_core_web_sm")
+grammar_pool = registry.acquire("languagetool")
+grammar_tool = grammar_pool[0]
+
+# Cache key part for LanguageTool verdicts; language_tool_python pins the LT release it downloads
+GRAMMAR_CHECKER = "languagetool"
+GRAMMAR_CHECKER_VERSION = os.environ.get("LANGUAGETOOL_VERSION") or package_version("language_tool_python")
 
 # ----------- INPUT / OUTPUT MODELS -----------
 
@@ -33,6 +45,23 @@ class SentenceOut(BaseModel):
 
 URL_PATTERN = re.compile(r"https?://\S+|www\.\S+", re.IGNORECASE)
 
+# Detector patterns are compiled once at import instead of on every sentence
+DEFINITION_PATTERN = re.compile(r"\b(is|are|refers to|means|stands for)\b")
+PREDICTION_PATTERN = re.compile(r"\b(will|is likely to|expected to|is going to)\b")
+SUGGESTION_PATTERN = re.compile(r"\b(you should|consider|try to|recommend)\b")
+TRANSITION_PATTERN = re.compile(r"\b(however|therefore|moving on|next|furthermore)\b")
+OPINION_PATTERN = re.compile(r"\b(i think|we believe|in my view)\b")
+OBSERVATION_PATTERN = re.compile(r"\b(we noticed|we observed|users tend to)\b")
+DERIVED_PATTERN = re.compile(r"\b(according to|as per|per the|reports that)\b")
+FIRST_PERSON_SOURCE_PATTERN = re.compile(r"\b(we observed|we noticed|we found|in our study|our analysis shows)\b")
+THIRD_PERSON_SOURCE_PATTERN = re.compile(r"\b(according to|as per|based on|per the|reports that)\b")
+
+# nlp.pipe settings for /tag. Multiprocessing only pays off for large requests,
+# so n_process > 1 is used only from TAG_MULTIPROCESS_MIN sentences upwards.
+TAG_BATCH_SIZE = int(os.environ.get("TAG_BATCH_SIZE", "256"))
+TAG_N_PROCESS = int(os.environ.get("TAG_N_PROCESS", "1"))
+TAG_MULTIPROCESS_MIN = int(os.environ.get("TAG_MULTIPROCESS_MIN", "2000"))
+
 # ----------- 1) FUNCTIONAL TYPE (SEMANTIC) -----------
 
 def detect_functional_type(doc, text: str) -> str:
@@ -87,28 +116,28 @@ def detect_informative_type(doc, text: str) -> str:
     if any(tok.like_num for tok in doc):
         return "Statistic"
 
-    if re.search(r"\b(is|are|refers to|means|stands for)\b", text_lower):
+    if DEFINITION_PATTERN.search(text_lower):
         return "Definition"
 
     if text.strip().endswith("?"):
         return "Question"
 
-    if re.search(r"\b(will|is likely to|expected to|is going to)\b", text_lower):
+    if PREDICTION_PATTERN.search(text_lower):
         return "Prediction"
 
-    if re.search(r"\b(you should|consider|try to|recommend)\b", text_lower):
+    if SUGGESTION_PATTERN.search(text_lower):
         return "Suggestion"
 
-    if re.search(r"\b(however|therefore|moving on|next|furthermore)\b", text_lower):
+    if TRANSITION_PATTERN.search(text_lower):
         return "Transition"
 
     if len(doc) <= 4:
         return "Filler"
 
-    if re.search(r"\b(i think|we believe|in my view)\b", text_lower):
+    if OPINION_PATTERN.search(text_lower):
         return "Opinion"
 
-    if re.search(r"\b(we noticed|we observed|users tend to)\b", text_lower):
+    if OBSERVATION_PATTERN.search(text_lower):
         return "Observation"
 
     return "Fact"
@@ -118,7 +147,7 @@ def detect_informative_type(doc, text: str) -> str:
 def detect_info_quality(doc, text: str) -> str:
     text_lower = text.lower()
 
-    if re.search(r"\b(according to|as per|per the|reports that)\b", text_lower):
+    if DERIVED_PATTERN.search(text_lower):
         return "Derived"
 
     if any(ent.label_ in {"ORG", "GPE", "LAW", "PRODUCT"} for ent in doc.ents):
@@ -149,11 +178,11 @@ def detect_claims_citation(doc, text: str) -> bool:
     text_lower = text.lower()
 
     # 1) First-person source
-    if re.search(r"\b(we observed|we noticed|we found|in our study|our analysis shows)\b", text_lower):
+    if FIRST_PERSON_SOURCE_PATTERN.search(text_lower):
         return True
 
     # 2) Third-person source
-    if re.search(r"\b(according to|as per|based on|per the|reports that)\b", text_lower):
+    if THIRD_PERSON_SOURCE_PATTERN.search(text_lower):
         return True
 
     # 3) Visible hyperlink
@@ -177,10 +206,115 @@ def detect_claims_citation(doc, text: str) -> bool:
 
 # ----------- 8) GRAMMAR CHECK (REAL NLP, NOT LLM) -----------
 
-def detect_grammar(text: str) -> bool:
+def detect_grammar(text: str, use_cache: bool = True) -> bool:
+    if use_cache:
+        return grammar_cache.get_or_check(
+            text, GRAMMAR_CHECKER, GRAMMAR_CHECKER_VERSION, lambda: detect_grammar(text, use_cache=False)
+        )
     matches = grammar_tool.check(text)
     return len(matches) == 0
 
+# Batched variant: sentences are joined into as few LanguageTool calls as
+# possible and every match is mapped back to its sentence via an offset map.
+
+GRAMMAR_SEPARATOR = "\n\n"
+GRAMMAR_CHUNK_CHARS = int(os.environ.get("GRAMMAR_CHUNK_CHARS", "20000"))
+# LanguageTool counts offsets in UTF-16 units (some language_tool_python releases convert
+# them back to code points, others don't), so past an emoji or other non-BMP character the
+# offset map would point at the wrong sentence. Such sentences get a call of their own.
+NON_BMP_PATTERN = re.compile("[\U00010000-\U0010FFFF]")
+
+# Rules that compare neighbouring sentences/paragraphs. They can only fire on the
+# joined batch text, never on a sentence checked on its own, so they are ignored.
+CROSS_SENTENCE_RULES = {
+    "ENGLISH_WORD_REPEAT_BEGINNING_RULE",
+    "PARAGRAPH_REPEAT_BEGINNING_RULE",
+    "EN_REPEATEDWORDS_SENTENCE_START",
+    "PUNCTUATION_PARAGRAPH_END",
+}
+
+_free_grammar_tools = queue.Queue()
+for _tool in grammar_pool:
+    _free_grammar_tools.put(_tool)
+_grammar_executor = ThreadPoolExecutor(max_workers=len(grammar_pool), thread_name_prefix="languagetool")
+
+def build_grammar_chunks(texts: List[str], max_chars: int = GRAMMAR_CHUNK_CHARS):
+    """Groups sentence indexes into chunks whose joined text stays under max_chars; a
+    sentence with non-BMP characters is always a chunk on its own."""
+    chunks, current, size = [], [], 0
+    for idx, text in enumerate(texts):
+        if NON_BMP_PATTERN.search(text):
+            chunks.append([idx])
+            continue
+        extra = len(text) + (len(GRAMMAR_SEPARATOR) if current else 0)
+        if current and size + extra > max_chars:
+            chunks.append(current)
+            current, size = [], 0
+            extra = len(text)
+        current.append(idx)
+        size += extra
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _check_grammar_chunk(texts: List[str], indexes: List[int]) -> List[int]:
+    """Runs one LanguageTool call for a chunk and returns the match count per sentence."""
+    starts, parts, pos = [], [], 0
+    for idx in indexes:
+        starts.append(pos)
+        parts.append(texts[idx])
+        pos += len(texts[idx]) + len(GRAMMAR_SEPARATOR)
+
+    tool = _free_grammar_tools.get()
+    try:
+        matches = tool.check(GRAMMAR_SEPARATOR.join(parts))
+    finally:
+        _free_grammar_tools.put(tool)
+
+    counts = [0] * len(indexes)
+    for match in matches:
+        if match.ruleId in CROSS_SENTENCE_RULES:
+            continue
+        if len(indexes) == 1:
+            # Nothing to map (and the offsets may be UTF-16 units, see NON_BMP_PATTERN)
+            counts[0] += 1
+            continue
+        local = bisect_right(starts, match.offset) - 1
+        # Matches that start inside the separator belong to no sentence
+        if local < 0 or match.offset >= starts[local] + len(parts[local]):
+            continue
+        counts[local] += 1
+    return counts
+
+def check_grammar_batch(texts: List[str], use_cache: bool = True) -> List[bool]:
+    """detect_grammar() for a whole request; chunks are spread over the LanguageTool pool."""
+    if use_cache:
+        cached = grammar_cache.get_many(texts, GRAMMAR_CHECKER, GRAMMAR_CHECKER_VERSION)
+        missing = [i for i, verdict in enumerate(cached) if verdict is None]
+        if missing:
+            # Repeated sentences inside one request are only checked once
+            unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+            verdicts = dict(zip(unique_texts, check_grammar_batch(unique_texts, use_cache=False)))
+            grammar_cache.put_many(verdicts.items(), GRAMMAR_CHECKER, GRAMMAR_CHECKER_VERSION)
+            for i in missing:
+                cached[i] = verdicts[texts[i]]
+        return cached
+
+    results = [True] * len(texts)
+    chunks = [c for c in build_grammar_chunks(texts) if any(texts[i].strip() for i in c)]
+    if not chunks:
+        return results
+
+    if len(chunks) == 1 or len(grammar_pool) == 1:
+        chunk_counts = [_check_grammar_chunk(texts, c) for c in chunks]
+    else:
+        chunk_counts = list(_grammar_executor.map(lambda c: _check_grammar_chunk(texts, c), chunks))
+
+    for indexes, counts in zip(chunks, chunk_counts):
+        for idx, count in zip(indexes, counts):
+            results[idx] = count == 0
+    return results
+
 # ----------- 9) HAS PRONOUN (SYNTACTIC DETECTION) -----------
 
 PRONOUN_TAGS = {"PRP", "PRP$", "WP", "WDT"}
@@ -193,26 +327,36 @@ def detect_pronoun(doc) -> bool:
 
 # ----------- API ENDPOINT -----------
 
+@app.get("/grammar-cache/stats")
+def grammar_cache_stats():
+    return grammar_cache.stats()
+
+def parse_sentences(texts: List[str], batch_size: int = TAG_BATCH_SIZE, n_process: int = TAG_N_PROCESS):
+    """Streams texts through nlp.pipe; yields one Doc per text, in order."""
+    if n_process > 1 and len(texts) < TAG_MULTIPROCESS_MIN:
+        n_process = 1
+    return nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+
+def tag_sentence(s: SentenceIn, doc, is_grammatical: bool) -> SentenceOut:
+    return SentenceOut(
+        SentenceId=s.Id,
+        FunctionalType=detect_functional_type(doc, s.Text),
+        Structure=detect_structure(doc),
+        Voice=detect_voice(doc),
+        InformativeType=detect_informative_type(doc, s.Text),
+        InfoQuality=detect_info_quality(doc, s.Text),
+        ClaritySynthesisType=detect_clarity(doc),
+        ClaimsCitation=detect_claims_citation(doc, s.Text),
+        IsGrammaticallyCorrect=is_grammatical,
+        HasPronoun=detect_pronoun(doc),
+    )
+
 @app.post("/tag", response_model=List[SentenceOut])
 def tag_sentences(sentences: List[SentenceIn]):
-    results = []
-
-    for s in sentences:
-        doc = nlp(s.Text)
-
-        results.append(
-            SentenceOut(
-                SentenceId=s.Id,
-                FunctionalType=detect_functional_type(doc, s.Text),
-                Structure=detect_structure(doc),
-                Voice=detect_voice(doc),
-                InformativeType=detect_informative_type(doc, s.Text),
-                InfoQuality=detect_info_quality(doc, s.Text),
-                ClaritySynthesisType=detect_clarity(doc),
-                ClaimsCitation=detect_claims_citation(doc, s.Text),
-                IsGrammaticallyCorrect=detect_grammar(s.Text),
-                HasPronoun=detect_pronoun(doc),
-            )
-        )
+    texts = [s.Text for s in sentences]
+    grammar_flags = check_grammar_batch(texts)
 
-    return results
+    return [
+        tag_sentence(s, doc, is_grammatical)
+        for s, doc, is_grammatical in zip(sentences, parse_sentences(texts), grammar_flags)
+    ]
@@ -0,0 +1,13 @@
+# Fixture sentences shared by the bench_*.py scripts and build_pruned_vectors.py.
+# Plain data on purpose: importing it must not load spaCy or start LanguageTool.
+
+SAMPLE_SENTENCES = [
+    "Most businesses only deal with one or two 1099 forms, but choosing the wrong one is a common reason filings get flagged.",
+    "The IRS separates non-employee compensation from other income types, and each category has its own form and rules.",
+    "Form 1099-NEC is used to report payments of $600 or more to independent contractors.",
+    "You should file the forms before January 31 to avoid penalties.",
+    "This are the requirement that every business need to follow.",
+    "Book a demo to see how our platform automates 1099 filing.",
+    "Penalties increases the longer a business waits to correct a late filing.",
+    "What happens if you miss the deadline?",
+]
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+# Latency comparison: per-sentence LanguageTool calls vs the batched grammar stage used by /tag
+# (the grammar verdict cache is bypassed so every run measures LanguageTool itself)
+# Usage: python bench_grammar.py            (set LANGUAGETOOL_SERVERS to benchmark a pool)
+import itertools
+import time
+
+from app import detect_grammar, check_grammar_batch, grammar_pool
+from bench_fixtures import SAMPLE_SENTENCES
+
+SIZES = [50, 500, 5000]
+
+
+def make_sentences(n):
+    return list(itertools.islice(itertools.cycle(SAMPLE_SENTENCES), n))
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    print(f"LanguageTool instances in pool: {len(grammar_pool)}")
+    # Warm up the JVM so the first measurement is not dominated by start-up
+    detect_grammar(SAMPLE_SENTENCES[0], use_cache=False)
+
+    print(f"{'sentences':>10} | {'per-sentence (s)':>17} | {'batched (s)':>12} | {'speed-up':>8} | {'mismatches':>10}")
+    print("-" * 70)
+    for n in SIZES:
+        texts = make_sentences(n)
+        single, single_time = timed(lambda ts: [detect_grammar(t, use_cache=False) for t in ts], texts)
+        batched, batch_time = timed(lambda ts: check_grammar_batch(ts, use_cache=False), texts)
+        mismatches = sum(1 for a, b in zip(single, batched) if a != b)
+        print(f"{n:>10} | {single_time:>17.3f} | {batch_time:>12.3f} | {single_time / batch_time:>7.1f}x | {mismatches:>10}")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# /process-article latency per analysis profile, and how closely each profile's labels agree
+# with "full" on the fixture articles. Sentences are matched by text (the lite profile splits
+# with a rule-based sentencizer, so a few boundaries can differ; "split" is the share of full
+# sentences found verbatim); labels are compared on matched sentences only.
+# Usage: python bench_profiles.py [--articles DIR] [--runs 3] [--out results.json]
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+from bench_fixtures import SAMPLE_SENTENCES
+from loadtest import article_html, base_request
+from nlp_service import PROFILE_PIPELINES, AnalysisProfile, ArticleRequest, process_article_payload
+
+LABELS = [
+    "FunctionalType", "InformativeType", "Structure", "Voice", "InfoQuality", "ClaritySynthesisType",
+    "Source", "IsGrammaticallyCorrect", "answerSentenceFlag",
+]
+
+
+def fixtures(articles: Path = None):
+    request = base_request()
+    keyword = request["PrimaryKeyword"]
+    if articles:
+        return [(p.stem, p.read_text(encoding="utf-8", errors="ignore"), keyword) for p in sorted(articles.glob("*.htm*"))]
+    samples = "".join(f"<p>{s}</p>" for s in SAMPLE_SENTENCES)
+    return [
+        ("test_request", article_html(request), keyword),
+        ("samples", f"<h1>{keyword}</h1><h2>Overview</h2>{samples}", keyword),
+    ]
+
+
+def run(html, keyword, profile):
+    start = time.perf_counter()
+    payload = process_article_payload(ArticleRequest(htmlContent=html, primaryKeyword=keyword, profile=profile))
+    return payload, (time.perf_counter() - start) * 1000
+
+
+def agreement(full, other):
+    by_text = {s["Sentence"]: s for s in other["sentences"]}
+    matched = [(s, by_text[s["Sentence"]]) for s in full["sentences"] if s["Sentence"] in by_text]
+    if not matched:
+        return 0.0, {}, 0.0
+    labels = {label: sum(a[label] == b[label] for a, b in matched) / len(matched) for label in LABELS}
+    relevance = statistics.mean(abs(a["RelevanceScore"] - b["RelevanceScore"]) for a, b in matched)
+    return len(matched) / len(full["sentences"]), labels, relevance
+
+
+def answer_text(payload):
+    first = payload["answerPositionIndex"]
+    return next((s["Sentence"] for s in payload["sentences"] if s["SentenceId"] == first), None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=Path, help="directory of .html fixture articles")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--out", type=Path, help="save the table and label agreement as JSON")
+    args = parser.parse_args()
+
+    articles = fixtures(args.articles)
+    for profile in AnalysisProfile:
+        run(articles[0][1], articles[0][2], profile)  # warm-up (model load)
+
+    print(f"{'article':>14} | {'profile':>7} | {'sentences':>9} | {'median ms':>9} | {'speed-up':>8} | {'split':>6} | {'labels':>6} | {'|rel diff|':>10} | {'answer':>6}")
+    print("-" * 98)
+    per_label = {profile: {label: [] for label in LABELS} for profile in AnalysisProfile}
+    rows = []
+    for name, html, keyword in articles:
+        results = {}
+        for profile in AnalysisProfile:
+            timings = []
+            for _ in range(args.runs):
+                payload, ms = run(html, keyword, profile)
+                timings.append(ms)
+            results[profile] = (payload, statistics.median(timings))
+        full, full_ms = results[AnalysisProfile.FULL]
+        for profile, (payload, ms) in results.items():
+            split, labels, relevance = agreement(full, payload)
+            for label, value in labels.items():
+                per_label[profile][label].append(value)
+            label_mean = statistics.mean(labels.values()) if labels else 0.0
+            same_answer = answer_text(payload) == answer_text(full)
+            rows.append({
+                "article": name, "profile": profile.value, "sentences": len(payload["sentences"]),
+                "medianMs": round(ms, 1), "speedUp": round(full_ms / ms, 2), "split": round(split, 4),
+                "labels": round(label_mean, 4), "relevanceDiff": round(relevance, 4), "sameAnswer": same_answer,
+            })
+            print(f"{name[:14]:>14} | {profile.value:>7} | {len(payload['sentences']):>9} | {ms:>9.0f} | {full_ms / ms:>7.1f}x"
+                  f" | {split:>6.1%} | {label_mean:>6.1%} | {relevance:>10.4f} | {str(same_answer):>6}")
+
+    print("\nLabel agreement with full (mean over articles):")
+    agreement_by_label = {}
+    for profile in AnalysisProfile:
+        if profile is AnalysisProfile.FULL:
+            continue
+        agreement_by_label[profile.value] = {
+            label: round(statistics.mean(values), 4) for label, values in per_label[profile].items() if values
+        }
+        print(f"  {profile.value}: " + ", ".join(
+            f"{label} {value:.1%}" for label, value in agreement_by_label[profile.value].items()
+        ))
+    if args.out:
+        models = {profile.value: f"{p.meta['name']}-{p.meta['version']}" for profile, p in PROFILE_PIPELINES.items()}
+        args.out.write_text(json.dumps({"models": models, "rows": rows, "labelAgreement": agreement_by_label}, indent=2))
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# Serialization share of /analyze-style responses: validated SentenceOutput models + default
+# JSON encoding (before) vs the SentenceColumns buffer + FastJSONResponse (after), plus the
+# memory each representation holds while an article is in flight.
+# Usage: python bench_serialization.py
+import itertools
+import json
+import time
+import tracemalloc
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from bench_fixtures import SAMPLE_SENTENCES
+from fast_json import orjson
+from nlp_service import (
+    AnalysisResponse, SentenceOutput, analysis_response, analyze_logic, nlp,
+)
+from sentence_columns import SentenceColumns
+
+SIZES = [500, 5000]
+
+
+def analyze(n):
+    kw_doc, state = nlp("1099 forms"), {"is_keyword_active": True}
+    texts = itertools.islice(itertools.cycle(SAMPLE_SENTENCES), n)
+    return [analyze_logic(t, f"S{i + 1}", kw_doc, state) for i, t in enumerate(texts)]
+
+
+def build_before(records):
+    return [SentenceOutput(**r.to_dict()) for r in records]
+
+
+def build_after(records):
+    columns = SentenceColumns()
+    columns.extend(records)
+    return columns
+
+
+def serialize_before(records):
+    response = AnalysisResponse(sentences=build_before(records), answerPositionIndex="S1")
+    return JSONResponse(jsonable_encoder(response)).body
+
+
+def serialize_after(records):
+    return analysis_response(build_after(records), "S1").body
+
+
+def held_kb(build, records):
+    tracemalloc.start()
+    held = build(records)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return size / 1024
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+if __name__ == "__main__":
+    analyze(10)  # warm-up
+    print(f"encoder: {'orjson' if orjson else 'stdlib json (orjson not installed)'}")
+    print(f"{'sentences':>10} | {'analysis (ms)':>13} | {'before (ms)':>11} | {'share':>6} | {'after (ms)':>10} | {'share':>6} | {'identical':>9}")
+    print("-" * 84)
+    for n in SIZES:
+        records, analysis_ms = timed(analyze, n)
+        before, before_ms = timed(serialize_before, records)
+        after, after_ms = timed(serialize_after, records)
+        identical = json.loads(before) == json.loads(after)
+        print(
+            f"{n:>10} | {analysis_ms:>13.0f} | {before_ms:>11.1f} | {before_ms / (analysis_ms + before_ms):>6.1%}"
+            f" | {after_ms:>10.1f} | {after_ms / (analysis_ms + after_ms):>6.1%} | {str(identical):>9}"
+        )
+        print(f"{'':>10}   held per article: models {held_kb(build_before, records):.0f} KB,"
+              f" columns {held_kb(build_after, records):.0f} KB")
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# Latency of /similarity/batch per mode, on SectionScorer-shaped traffic (section heading vs sentence pairs)
+# Usage: python bench_similarity.py
+import itertools
+import time
+
+from nlp_service import compute_similarity, compute_transformer_similarities
+from bench_fixtures import SAMPLE_SENTENCES
+
+HEADINGS = [
+    "Which 1099 Forms Do You Need to File?",
+    "1099 Filing Deadlines",
+    "Penalties for Late Filing",
+    "How to File 1099 Forms Online",
+]
+
+BATCH_SIZES = [1, 20, 200, 1000]
+
+
+def make_pairs(n):
+    return list(itertools.islice(itertools.cycle(itertools.product(HEADINGS, SAMPLE_SENTENCES)), n))
+
+
+def run_spacy(pairs):
+    return [round(compute_similarity(a, b), 4) for a, b in pairs]
+
+
+def run_transformer(pairs):
+    return [round(s, 4) for s in compute_transformer_similarities(pairs)]
+
+
+if __name__ == "__main__":
+    run_spacy(make_pairs(4))
+    run_transformer(make_pairs(4))  # warm-up (model load, first forward pass)
+
+    print(f"{'pairs':>6} | {'spacy (ms)':>11} | {'transformer (ms)':>17}")
+    print("-" * 42)
+    for n in BATCH_SIZES:
+        pairs = make_pairs(n)
+        timings = []
+        for fn in (run_spacy, run_transformer):
+            start = time.perf_counter()
+            fn(pairs)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{n:>6} | {timings[0]:>11.1f} | {timings[1]:>17.1f}")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# /get-subtopics neighbour search: exact row-blocked search vs the random-projection LSH index,
+# reporting speed, pair recall (share of exact pairs above 0.6 the index finds) and subtopic
+# agreement (Jaccard of the resulting subtopic lists).
+# Embeddings are synthetic SERP-shaped clusters (paraphrased headings around shared topics, 768-d
+# like all-mpnet-base-v2) so large heading counts can be tried without encoding; pass --model to
+# encode the section texts and sentences of test_request.json, repeated, with the real model instead.
+# Usage: python bench_subtopics.py [--sizes 2000 20000] [--tables 8 16 32] [--bits 5 6 8] [--model]
+import argparse
+import json
+import time
+
+import numpy as np
+
+from ann_index import ANN_BITS, ANN_TABLES, RandomProjectionLSH, exact_neighbors
+
+THRESHOLD = 0.6
+DIM = 768
+COMPETITORS = 50
+
+
+def synthetic(n, seed=0):
+    """n unit vectors: topics shared by several competitors, each heading a noisy paraphrase."""
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((max(n // 8, 1), DIM)).astype(np.float32)
+    topic_of = rng.integers(0, len(topics), n)
+    noise = rng.uniform(0.5, 1.2, (n, 1)).astype(np.float32)
+    vectors = topics[topic_of] + noise * rng.standard_normal((n, DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    texts = [f"topic {t} heading {i}" for i, t in enumerate(topic_of)]
+    return vectors, texts, rng.integers(0, COMPETITORS, n).tolist()
+
+
+def from_model(n):
+    from nlp_service import model
+    with open("test_request.json", encoding="utf-8") as f:
+        sections = json.load(f)["sections"]
+    headings = [text for s in sections for text in [s["SectionText"], *s["Sentences"]]]
+    texts = [f"{headings[i % len(headings)]} ({i // len(headings)})" for i in range(n)]
+    vectors = model.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+    return vectors, texts, [i % COMPETITORS for i in range(n)]
+
+
+def pairs(neighbors):
+    return {(i, int(j)) for i, js in enumerate(neighbors) for j in js}
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+if __name__ == "__main__":
+    from nlp_service import group_subtopics
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 20000])
+    parser.add_argument("--tables", type=int, nargs="+", default=[ANN_TABLES // 2, ANN_TABLES, ANN_TABLES * 2])
+    parser.add_argument("--bits", type=int, nargs="+", default=[ANN_BITS])
+    parser.add_argument("--model", action="store_true", help="encode headings with the real sentence-transformer")
+    args = parser.parse_args()
+
+    print(f"{'headings':>8} | {'tables':>6} | {'bits':>4} | {'exact (ms)':>10} | {'lsh (ms)':>8} | {'pair recall':>11} | {'subtopic jaccard':>16}")
+    print("-" * 82)
+    for n in args.sizes:
+        vectors, texts, comps = from_model(n) if args.model else synthetic(n)
+        exact, exact_ms = timed(exact_neighbors, vectors, THRESHOLD)
+        exact_pairs = pairs(exact)
+        exact_topics = set(group_subtopics(texts, comps, exact))
+        for tables in args.tables:
+            for bits in args.bits:
+                approx, lsh_ms = timed(lambda: RandomProjectionLSH(vectors, tables, bits).neighbors(THRESHOLD))
+                recall = len(pairs(approx) & exact_pairs) / len(exact_pairs) if exact_pairs else 1.0
+                approx_topics = set(group_subtopics(texts, comps, approx))
+                union = exact_topics | approx_topics
+                jaccard = len(exact_topics & approx_topics) / len(union) if union else 1.0
+                print(f"{n:>8} | {tables:>6} | {bits:>4} | {exact_ms:>10.0f} | {lsh_ms:>8.0f} | {recall:>11.3f} | {jaccard:>16.3f}")
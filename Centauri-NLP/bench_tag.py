@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# Throughput of the /tag spaCy + detector stage: the original per-sentence nlp() loop with
+# uncompiled detector patterns (before) vs nlp.pipe with the precompiled patterns (after)
+# Grammar is left out on purpose (see bench_grammar.py), it would dominate both columns.
+# Usage: python bench_tag.py [n_process]
+import itertools
+import re
+import sys
+import time
+
+from app import (
+    URL_PATTERN, SentenceIn, SentenceOut, detect_clarity, detect_functional_type, detect_pronoun,
+    detect_structure, detect_voice, nlp, parse_sentences, tag_sentence,
+)
+from bench_fixtures import SAMPLE_SENTENCES
+
+SIZES = [1000, 10000]
+
+
+def make_sentences(n):
+    texts = itertools.islice(itertools.cycle(SAMPLE_SENTENCES), n)
+    return [SentenceIn(Id=f"S{i + 1}", Text=t) for i, t in enumerate(texts)]
+
+
+# ----------- BEFORE: the detectors and the /tag loop as they were -----------
+
+def detect_informative_type_before(doc, text: str) -> str:
+    text_lower = text.lower()
+
+    if any(tok.like_num for tok in doc):
+        return "Statistic"
+
+    if re.search(r"\b(is|are|refers to|means|stands for)\b", text_lower):
+        return "Definition"
+
+    if text.strip().endswith("?"):
+        return "Question"
+
+    if re.search(r"\b(will|is likely to|expected to|is going to)\b", text_lower):
+        return "Prediction"
+
+    if re.search(r"\b(you should|consider|try to|recommend)\b", text_lower):
+        return "Suggestion"
+
+    if re.search(r"\b(however|therefore|moving on|next|furthermore)\b", text_lower):
+        return "Transition"
+
+    if len(doc) <= 4:
+        return "Filler"
+
+    if re.search(r"\b(i think|we believe|in my view)\b", text_lower):
+        return "Opinion"
+
+    if re.search(r"\b(we noticed|we observed|users tend to)\b", text_lower):
+        return "Observation"
+
+    return "Fact"
+
+
+def detect_info_quality_before(doc, text: str) -> str:
+    text_lower = text.lower()
+
+    if re.search(r"\b(according to|as per|per the|reports that)\b", text_lower):
+        return "Derived"
+
+    if any(ent.label_ in {"ORG", "GPE", "LAW", "PRODUCT"} for ent in doc.ents):
+        return "WellKnown"
+
+    if "our " in text_lower or "we " in text_lower:
+        return "Unique"
+
+    return "PartiallyKnown"
+
+
+def detect_claims_citation_before(doc, text: str) -> bool:
+    text_lower = text.lower()
+
+    if re.search(r"\b(we observed|we noticed|we found|in our study|our analysis shows)\b", text_lower):
+        return True
+
+    if re.search(r"\b(according to|as per|based on|per the|reports that)\b", text_lower):
+        return True
+
+    if URL_PATTERN.search(text):
+        return True
+
+    if any(tok.like_num for tok in doc):
+        return False
+
+    reporting_verbs = {"says", "states", "reports", "claims", "found", "showed"}
+    has_reporting = any(tok.lemma_ in reporting_verbs for tok in doc)
+    has_entity = any(ent.label_ in {"ORG", "PERSON", "GPE"} for ent in doc.ents)
+
+    return has_reporting and has_entity
+
+
+def run_before(sentences):
+    results = []
+    for s in sentences:
+        doc = nlp(s.Text)
+
+        results.append(
+            SentenceOut(
+                SentenceId=s.Id,
+                FunctionalType=detect_functional_type(doc, s.Text),
+                Structure=detect_structure(doc),
+                Voice=detect_voice(doc),
+                InformativeType=detect_informative_type_before(doc, s.Text),
+                InfoQuality=detect_info_quality_before(doc, s.Text),
+                ClaritySynthesisType=detect_clarity(doc),
+                ClaimsCitation=detect_claims_citation_before(doc, s.Text),
+                IsGrammaticallyCorrect=True,
+                HasPronoun=detect_pronoun(doc),
+            )
+        )
+
+    return results
+
+
+# ----------- AFTER: the current /tag path -----------
+
+def run_after(sentences, n_process):
+    docs = parse_sentences([s.Text for s in sentences], n_process=n_process)
+    return [tag_sentence(s, doc, True) for s, doc in zip(sentences, docs)]
+
+
+if __name__ == "__main__":
+    n_process = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    run_before(make_sentences(10))  # warm-up
+
+    print(f"n_process={n_process}")
+    print(f"{'sentences':>10} | {'before (sent/s)':>16} | {'after (sent/s)':>15} | {'speed-up':>8} | {'identical':>9}")
+    print("-" * 72)
+    for n in SIZES:
+        sentences = make_sentences(n)
+
+        start = time.perf_counter()
+        before = run_before(sentences)
+        before_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        after = run_after(sentences, n_process)
+        after_time = time.perf_counter() - start
+
+        identical = before == after
+        print(f"{n:>10} | {n / before_time:>16.0f} | {n / after_time:>15.0f} | {before_time / after_time:>7.1f}x | {str(identical):>9}")
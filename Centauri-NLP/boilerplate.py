@@ -0,0 +1,209 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Near-duplicate boilerplate detection for /process-article (nav snippets, CTAs, author
+# bios, footer disclaimers repeated with small variations). Blocks are shingled into word
+# 3-grams, MinHashed and bucketed with LSH; bucket collisions are confirmed by the
+# signature-estimated Jaccard similarity.
+BOILERPLATE_NUM_PERM = 64
+BOILERPLATE_BANDS = 16  # 16 bands x 4 rows: candidates from roughly 0.5 Jaccard upwards
+BOILERPLATE_SHINGLE_SIZE = 3
+BOILERPLATE_THRESHOLD = float(os.environ.get("BOILERPLATE_THRESHOLD", "0.8"))
+# Shorter blocks are too small for MinHash; they only get the exact-text dedupe
+BOILERPLATE_MIN_WORDS = int(os.environ.get("BOILERPLATE_MIN_WORDS", "8"))
+# A block counts as site boilerplate once seen on this many other pages of the same site
+BOILERPLATE_SITE_MIN_PAGES = int(os.environ.get("BOILERPLATE_SITE_MIN_PAGES", "3"))
+# The default file sits next to this module whatever the working directory;
+# BOILERPLATE_STORE_PATH="" keeps site fingerprints in memory only
+BOILERPLATE_STORE_PATH = os.environ.get(
+    "BOILERPLATE_STORE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "boilerplate_fingerprints.db")
+)
+# Page sightings older than this are dropped, then fingerprints no page has been seen with
+BOILERPLATE_RETENTION_DAYS = float(os.environ.get("BOILERPLATE_RETENTION_DAYS", "90"))
+BOILERPLATE_PRUNE_INTERVAL_SECONDS = 3600
+
+_MERSENNE_PRIME = np.uint64(4294967311)  # smallest prime above 2**32
+_rng = np.random.RandomState(7)  # fixed seed: signatures must be comparable across processes
+_PERM_A = _rng.randint(1, 2 ** 32 - 1, size=BOILERPLATE_NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 2 ** 32 - 1, size=BOILERPLATE_NUM_PERM, dtype=np.uint64)
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int = BOILERPLATE_SHINGLE_SIZE) -> Set[str]:
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash(text: str) -> Optional[np.ndarray]:
+    """MinHash signature (uint64[BOILERPLATE_NUM_PERM]), or None for blocks too short to fingerprint."""
+    if len(WORD_PATTERN.findall(text)) < BOILERPLATE_MIN_WORDS:
+        return None
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles(text)), dtype=np.uint64)
+    # (a * x + b) mod p for every permutation at once; a, x < 2**32 keeps it inside uint64
+    permuted = (np.outer(_PERM_A, hashes) + _PERM_B[:, None]) % _MERSENNE_PRIME
+    return permuted.min(axis=1)
+
+
+def band_keys(signature: np.ndarray) -> List[str]:
+    rows = BOILERPLATE_NUM_PERM // BOILERPLATE_BANDS
+    return [
+        f"{band}:" + hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8).hexdigest()
+        for band in range(BOILERPLATE_BANDS)
+    ]
+
+
+def estimated_jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.mean(a == b))
+
+
+class SiteFingerprintStore:
+    """Block fingerprints per site, with the distinct pages each one was seen on (and when)."""
+
+    def __init__(self, path: str = BOILERPLATE_STORE_PATH, retention_days: float = BOILERPLATE_RETENTION_DAYS):
+        self._lock = threading.Lock()
+        self.retention_days = retention_days
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False, timeout=30)
+        self._db.executescript(
+            "PRAGMA journal_mode=WAL;"
+            "CREATE TABLE IF NOT EXISTS fingerprints (id INTEGER PRIMARY KEY, site TEXT NOT NULL, signature BLOB NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS bands (site TEXT NOT NULL, band TEXT NOT NULL, fingerprint INTEGER NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS bands_lookup ON bands (site, band);"
+            "CREATE TABLE IF NOT EXISTS pages (fingerprint INTEGER NOT NULL, page TEXT NOT NULL, PRIMARY KEY (fingerprint, page));"
+        )
+        # Stores from before retention have no "seen" column; their rows expire on the first prune
+        if "seen" not in {row[1] for row in self._db.execute("PRAGMA table_info(pages)")}:
+            self._db.execute("ALTER TABLE pages ADD COLUMN seen REAL NOT NULL DEFAULT 0")
+        self._db.commit()
+        self._pruned = 0.0
+        self.prune()
+
+    def match(self, site: str, signature: np.ndarray, keys: List[str]) -> Optional[Tuple[int, float]]:
+        """Best stored fingerprint for the signature: (fingerprint id, similarity)."""
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT DISTINCT f.id, f.signature FROM bands b JOIN fingerprints f ON f.id = b.fingerprint "
+                f"WHERE b.site = ? AND b.band IN ({placeholders})", [site, *keys]
+            ).fetchall()
+        best = None
+        for fp_id, blob in rows:
+            similarity = estimated_jaccard(signature, np.frombuffer(blob, dtype=np.uint64))
+            if similarity >= BOILERPLATE_THRESHOLD and (best is None or similarity > best[1]):
+                best = (fp_id, similarity)
+        return best
+
+    def pages_seen(self, fingerprint: int, exclude_page: str) -> int:
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM pages WHERE fingerprint = ? AND page != ?", (fingerprint, exclude_page)
+            ).fetchone()[0]
+
+    def record_many(self, site: str, page: str, blocks: List[Tuple[np.ndarray, List[str], Optional[int]]]):
+        """One article's blocks, (signature, band keys, matched fingerprint or None), in one transaction."""
+        now = time.time()
+        with self._lock, self._db:
+            for signature, keys, fingerprint in blocks:
+                if fingerprint is None:
+                    cursor = self._db.execute(
+                        "INSERT INTO fingerprints (site, signature) VALUES (?, ?)", (site, signature.tobytes())
+                    )
+                    fingerprint = cursor.lastrowid
+                    self._db.executemany(
+                        "INSERT INTO bands VALUES (?, ?, ?)", [(site, key, fingerprint) for key in keys]
+                    )
+                self._db.execute(
+                    "INSERT INTO pages (fingerprint, page, seen) VALUES (?, ?, ?) "
+                    "ON CONFLICT (fingerprint, page) DO UPDATE SET seen = excluded.seen", (fingerprint, page, now)
+                )
+        if now - self._pruned > BOILERPLATE_PRUNE_INTERVAL_SECONDS:
+            self.prune()
+
+    def prune(self):
+        if not self.retention_days:
+            return
+        cutoff = time.time() - self.retention_days * 86400
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM pages WHERE seen < ?", (cutoff,))
+            self._db.execute("DELETE FROM fingerprints WHERE id NOT IN (SELECT fingerprint FROM pages)")
+            self._db.execute("DELETE FROM bands WHERE fingerprint NOT IN (SELECT id FROM fingerprints)")
+            self._pruned = time.time()
+
+
+_site_store: Optional[SiteFingerprintStore] = None
+_site_store_lock = threading.Lock()
+
+
+def get_site_store() -> SiteFingerprintStore:
+    global _site_store
+    with _site_store_lock:
+        if _site_store is None:
+            _site_store = SiteFingerprintStore()
+        return _site_store
+
+
+class BoilerplateDetector:
+    """One per article. check() returns None for content blocks, or a description of
+    the earlier block (same article) or site fingerprint it near-duplicates. Only content
+    blocks join the in-article index, so matchedBlockId always names a block the caller
+    kept (block_id is the caller's id for the block if it is kept). The site scope
+    needs both site_id and page_key (a stable page URL or id, so revisions of one page
+    count as one page); the article's fingerprints are stored by flush()."""
+
+    def __init__(self, site_id: Optional[str] = None, page_key: Optional[str] = None,
+                 site_store: Optional[SiteFingerprintStore] = None):
+        self.site_id = site_id
+        self.page_key = page_key
+        self.site_store = None
+        if site_id and page_key:
+            self.site_store = site_store if site_store is not None else get_site_store()
+        self._pending: List[Tuple[np.ndarray, List[str], Optional[int]]] = []
+        self._buckets: Dict[str, List[int]] = defaultdict(list)
+        self._signatures: List[np.ndarray] = []
+        self._block_ids: List[str] = []
+
+    def check(self, text: str, block_id: str) -> Optional[Dict]:
+        signature = minhash(text)
+        if signature is None:
+            return None
+        keys = band_keys(signature)
+
+        # 1. Within this article
+        candidates = {i for key in keys for i in self._buckets.get(key, ())}
+        best = max(
+            ((i, estimated_jaccard(signature, self._signatures[i])) for i in candidates),
+            key=lambda item: item[1], default=None
+        )
+        if best is not None and best[1] >= BOILERPLATE_THRESHOLD:
+            return {"scope": "article", "matchedBlockId": self._block_ids[best[0]], "similarity": round(best[1], 4)}
+
+        # 2. Across the site's other pages
+        if self.site_store is not None:
+            site_match = self.site_store.match(self.site_id, signature, keys)
+            fingerprint = site_match[0] if site_match else None
+            self._pending.append((signature, keys, fingerprint))
+            if site_match and self.site_store.pages_seen(fingerprint, self.page_key) >= BOILERPLATE_SITE_MIN_PAGES:
+                return {"scope": "site", "matchedBlockId": None, "similarity": round(site_match[1], 4)}
+
+        index = len(self._signatures)
+        self._signatures.append(signature)
+        self._block_ids.append(block_id)
+        for key in keys:
+            self._buckets[key].append(index)
+        return None
+
+    def flush(self):
+        if self.site_store is not None and self._pending:
+            self.site_store.record_many(self.site_id, self.page_key, self._pending)
+            self._pending = []
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# Builds a pruned en_core_web_lg vector table for SPACY_VECTORS_PATH (see model_registry.py)
+# and reports how far it moves our outputs.
+#
+#   python build_pruned_vectors.py vectors_lg_50k --rows 50000
+#   SPACY_VECTORS_PATH=vectors_lg_50k uvicorn main:app
+#
+# The model's rows are ordered by word frequency; the first --rows are kept and every other
+# word is remapped to its nearest kept vector (Vocab.prune_vectors), so no key loses its
+# vector. Output: vectors.npy (float32 table, loaded with mmap_mode="r"), keys.npy/rows.npy
+# (key -> row) and meta.json.
+# The report runs the fixture sentences (bench_fixtures.SAMPLE_SENTENCES and test_request.json)
+# through the full and the pruned pipeline and compares relevance scores, answer flags and
+# POS tags (en_core_web_lg's tok2vec reads the static vectors too).
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from bench_fixtures import SAMPLE_SENTENCES
+from model_registry import load_pruned_vectors
+
+DEFAULT_ROWS = 50000
+
+
+def build(model: str, out_dir: str, rows: int, batch_size: int) -> dict:
+    import spacy
+    nlp = spacy.load(model)
+    full_rows, dim = nlp.vocab.vectors.shape
+    if rows >= full_rows:
+        raise SystemExit(f"{model} has {full_rows} vector rows; --rows {rows} would not prune anything")
+    start = time.perf_counter()
+    remapped = nlp.vocab.prune_vectors(rows, batch_size=batch_size)
+    vectors = nlp.vocab.vectors
+    os.makedirs(out_dir, exist_ok=True)
+    np.save(os.path.join(out_dir, "vectors.npy"), np.ascontiguousarray(vectors.data, dtype=np.float32))
+    np.save(os.path.join(out_dir, "keys.npy"), np.fromiter(vectors.key2row.keys(), dtype=np.uint64))
+    np.save(os.path.join(out_dir, "rows.npy"), np.fromiter(vectors.key2row.values(), dtype=np.int64))
+    meta = {
+        "model": model,
+        "modelVersion": nlp.meta["version"],
+        "name": f"{nlp.vocab.vectors.name or model}_pruned_{rows}",
+        "rows": rows,
+        "fullRows": full_rows,
+        "dim": dim,
+        "keys": len(vectors.key2row),
+        "remapped": len(remapped),
+        "meanRemapSimilarity": float(np.mean([score for _, score in remapped.values()])) if remapped else 1.0,
+        "fullTableMb": round(full_rows * dim * 4 / 2 ** 20, 1),
+        "prunedTableMb": round(rows * dim * 4 / 2 ** 20, 1),
+        "buildSeconds": round(time.perf_counter() - start, 1),
+    }
+    with open(os.path.join(out_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def fixtures():
+    with open("test_request.json", encoding="utf-8") as f:
+        request = json.load(f)
+    sentences = list(SAMPLE_SENTENCES)
+    for section in request["sections"]:
+        sentences += [section["SectionText"], *section["Sentences"]]
+    keywords = [request["PrimaryKeyword"], *request.get("secondaryKeywords", [])]
+    return list(dict.fromkeys(sentences)), keywords
+
+
+def scores(nlp, sentences, keyword):
+    """(relevance, answer flag) per sentence, computed the way analyze_logic does."""
+    from nlp_service import ANSWER_RELEVANCE_THRESHOLD, answer_eligible, classify_informative_type_merged, keyword_context
+    keyword_doc = nlp(keyword.lower())
+    state = {"is_keyword_active": True}
+    relevance, answers, tags = [], [], []
+    for doc in nlp.pipe(sentences):
+        score = doc.similarity(keyword_doc) if doc.vector_norm and keyword_doc.vector_norm else 0.0
+        in_context = keyword_context(doc, keyword_doc, state)
+        eligible = answer_eligible(doc, classify_informative_type_merged(doc))
+        relevance.append(round(score, 4))
+        answers.append(int(eligible and (score > ANSWER_RELEVANCE_THRESHOLD or in_context)))
+        tags.extend(t.tag_ for t in doc)
+    return np.array(relevance), np.array(answers), tags
+
+
+def report(model: str, out_dir: str):
+    import spacy
+    sentences, keywords = fixtures()
+    full = spacy.load(model)
+    pruned = load_pruned_vectors(spacy.load(model, exclude=["vectors"]), out_dir)
+    print(f"{len(sentences)} fixture sentences, keywords: {', '.join(keywords)}")
+    print(f"{'keyword':>28} | {'mean |diff|':>11} | {'max |diff|':>10} | {'equal (4dp)':>11} | {'answer flags':>12} | {'tags':>6}")
+    print("-" * 94)
+    for keyword in keywords:
+        rel_full, ans_full, tags_full = scores(full, sentences, keyword)
+        rel_pruned, ans_pruned, tags_pruned = scores(pruned, sentences, keyword)
+        diff = np.abs(rel_full - rel_pruned)
+        tag_agreement = np.mean([a == b for a, b in zip(tags_full, tags_pruned)])
+        print(f"{keyword[:28]:>28} | {diff.mean():>11.4f} | {diff.max():>10.4f} | {np.mean(diff == 0):>11.1%}"
+              f" | {np.mean(ans_full == ans_pruned):>12.1%} | {tag_agreement:>6.1%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a pruned, memory-mappable spaCy vector table.")
+    parser.add_argument("out_dir")
+    parser.add_argument("--model", default="en_core_web_lg")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="vector rows to keep (most frequent words)")
+    parser.add_argument("--batch-size", type=int, default=1024, help="rows per similarity batch while remapping")
+    parser.add_argument("--no-report", action="store_true", help="skip the accuracy report")
+    args = parser.parse_args(argv)
+
+    meta = build(args.model, args.out_dir, args.rows, args.batch_size)
+    print(json.dumps(meta, indent=2))
+    if not args.no_report:
+        report(args.model, args.out_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
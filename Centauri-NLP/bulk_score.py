@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# Offline re-scoring of a content library with the /process-article logic, no HTTP involved.
+#
+#   python bulk_score.py articles/ results.jsonl --keyword "1099 forms"
+#   python bulk_score.py manifest.jsonl results.jsonl --workers 4 --parquet results.parquet
+#
+# Input is a directory (*.json files holding ArticleRequest fields, or *.html files scored
+# against --keyword) or a JSONL manifest, one ArticleRequest per line; a line may give
+# "htmlPath" instead of "htmlContent", and an "id" (default: line number).
+# Output is one JSON line per article: {"id", "primaryKeyword", ...AnalysisResponse} or
+# {"id", "error"}. The output file doubles as the checkpoint: re-running the same command
+# skips every id already written, so an interrupted run resumes where it stopped
+# (failed articles are written as error lines too; delete those lines to retry them).
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+# Each worker process loads its own copy of the models (~1 GB with en_core_web_lg)
+BULK_WORKERS = int(os.environ.get("BULK_WORKERS", "2"))
+# Articles handed to a worker at a time
+BULK_CHUNK_SIZE = int(os.environ.get("BULK_CHUNK_SIZE", "4"))
+PROGRESS_EVERY_SECONDS = 10
+
+# (id, source kind, location, keyword override)
+Task = Tuple[str, str, str, Optional[str]]
+
+
+def iter_tasks(source: Path, keyword: Optional[str]) -> Iterator[Task]:
+    """Small task descriptors only; workers read the HTML themselves so the parent never
+    holds the corpus in memory."""
+    if source.is_dir():
+        for path in sorted(source.iterdir()):
+            if path.suffix == ".json":
+                yield path.stem, "json", str(path), keyword
+            elif path.suffix in (".html", ".htm"):
+                yield path.stem, "html", str(path), keyword
+        return
+    with open(source, "rb") as f:
+        line_no, offset = 0, 0
+        for line in f:
+            line_no += 1
+            if line.strip():
+                # The id is read here so resume can skip without a worker round-trip
+                item_id = json.loads(line).get("id", str(line_no))
+                yield str(item_id), "manifest", f"{source}:{offset}", keyword
+            offset += len(line)
+
+
+def load_request(kind: str, location: str, keyword: Optional[str]) -> Dict:
+    if kind == "html":
+        if not keyword:
+            raise ValueError("--keyword is required for .html inputs")
+        return {"htmlContent": Path(location).read_text(encoding="utf-8", errors="ignore"), "primaryKeyword": keyword}
+    if kind == "json":
+        item = json.loads(Path(location).read_text(encoding="utf-8"))
+    else:
+        path, offset = location.rsplit(":", 1)
+        with open(path, "rb") as f:
+            f.seek(int(offset))
+            item = json.loads(f.readline())
+    item.pop("id", None)
+    if "htmlPath" in item:
+        item["htmlContent"] = Path(item.pop("htmlPath")).read_text(encoding="utf-8", errors="ignore")
+    if keyword and not item.get("primaryKeyword"):
+        item["primaryKeyword"] = keyword
+    return item
+
+
+def score(task: Task) -> Tuple[str, bool]:
+    """(JSON line, succeeded). Serialized in the worker; the parent only appends lines."""
+    from fast_json import dumps
+    from nlp_service import ArticleRequest, process_article_payload
+    item_id, kind, location, keyword = task
+    try:
+        request = ArticleRequest(**load_request(kind, location, keyword))
+        payload = process_article_payload(request)
+        record, ok = {"id": item_id, "primaryKeyword": request.primaryKeyword, **payload}, True
+    except Exception as e:
+        record, ok = {"id": item_id, "error": f"{type(e).__name__}: {e}"}, False
+    return dumps(record).decode("utf-8"), ok
+
+
+def _init_worker():
+    # Load the models once per worker, not on the first article
+    import nlp_service
+    nlp_service.nlp("warm up")
+
+
+def completed_ids(output: Path) -> Set[str]:
+    """Ids already in the output. A torn last line from a killed run is cut off."""
+    done = set()
+    if not output.exists():
+        return done
+    good_bytes = 0
+    with open(output, "rb") as f:
+        for line in f:
+            try:
+                done.add(str(json.loads(line)["id"]))
+            except (ValueError, KeyError):
+                break
+            good_bytes += len(line)
+    with open(output, "r+b") as f:
+        f.truncate(good_bytes)
+    return done
+
+
+def write_parquet(jsonl: Path, parquet: Path):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("pyarrow is not installed; skipping Parquet output (the JSONL output is complete).")
+        return
+    with open(jsonl, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    pq.write_table(pa.Table.from_pylist(rows), parquet)
+    print(f"Wrote {len(rows)} rows to {parquet}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a corpus with the /process-article logic.")
+    parser.add_argument("source", type=Path, help="directory of .json/.html files, or a JSONL manifest")
+    parser.add_argument("output", type=Path, help="JSONL results file (also the resume checkpoint)")
+    parser.add_argument("--keyword", help="primaryKeyword for inputs that don't carry one")
+    parser.add_argument("--workers", type=int, default=BULK_WORKERS)
+    parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE)
+    parser.add_argument("--parquet", type=Path, help="also write the results as Parquet (needs pyarrow)")
+    args = parser.parse_args(argv)
+
+    done = completed_ids(args.output)
+    tasks = [t for t in iter_tasks(args.source, args.keyword) if t[0] not in done]
+    print(f"{len(done)} articles already scored, {len(tasks)} to go, {args.workers} worker(s)")
+
+    start = last_report = time.perf_counter()
+    scored = failed = 0
+    pool = multiprocessing.Pool(args.workers, initializer=_init_worker) if args.workers > 1 else None
+    results = pool.imap_unordered(score, tasks, chunksize=args.chunk_size) if pool else map(score, tasks)
+    try:
+        with open(args.output, "a", encoding="utf-8") as out:
+            for line, ok in results:
+                out.write(line + "\n")
+                out.flush()  # every finished article is checkpointed
+                scored += 1
+                failed += not ok
+                now = time.perf_counter()
+                if now - last_report >= PROGRESS_EVERY_SECONDS:
+                    print(f"{scored}/{len(tasks)} articles, {scored / (now - start):.2f} articles/sec")
+                    last_report = now
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+    elapsed = time.perf_counter() - start
+    rate = scored / elapsed if elapsed else 0.0
+    print(f"Scored {scored} articles ({failed} failed) in {elapsed:.1f}s: {rate:.2f} articles/sec")
+    if args.parquet:
+        write_parquet(args.output, args.parquet)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+import os
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, Tag
+
+# Main-content extraction ahead of /process-article block analysis. Page chrome (scripts,
+# nav, sidebars, cookie banners, related-post lists, TOC widgets) is removed, then DOM
+# subtrees are scored by text density the way Readability does and only the best
+# scoring container (plus the page's h1) is analyzed.
+EXTRACT_MAIN_CONTENT = os.environ.get("EXTRACT_MAIN_CONTENT", "0") == "1"
+# Paragraphs shorter than this don't vote for their container
+EXTRACT_MIN_PARAGRAPH_CHARS = int(os.environ.get("EXTRACT_MIN_PARAGRAPH_CHARS", "25"))
+# If the winning container holds less than this share of the page text, keep the whole page
+EXTRACT_MIN_TEXT_SHARE = float(os.environ.get("EXTRACT_MIN_TEXT_SHARE", "0.25"))
+
+BLOCK_TAGS = ["h1", "h2", "h3", "h4", "h5", "h6", "p", "li", "td", "th"]
+REMOVE_TAGS = ["script", "style", "noscript", "template", "svg", "iframe", "nav", "aside", "footer"]
+PROTECTED_TAGS = {"html", "body", "article", "main"}
+
+UNLIKELY_PATTERN = re.compile(
+    r"sidebar|related|cookie|consent|banner|\btoc\b|table-of-contents|breadcrumb|comment|share|social|"
+    r"newsletter|subscribe|advert|\bads?\b|promo|popup|modal|menu|widget|footer|masthead|pagination",
+    re.IGNORECASE,
+)
+MAYBE_CANDIDATE_PATTERN = re.compile(r"article|body|content|entry|main|post|story|text", re.IGNORECASE)
+POSITIVE_PATTERN = re.compile(r"article|body|content|entry|main|post|story|text|blog", re.IGNORECASE)
+NEGATIVE_PATTERN = re.compile(
+    r"sidebar|related|comment|footer|widget|promo|share|social|banner|advert|meta|nav|menu", re.IGNORECASE
+)
+
+
+def _class_and_id(tag: Tag) -> str:
+    return " ".join(tag.get("class") or []) + " " + (tag.get("id") or "")
+
+
+def _class_weight(tag: Tag) -> int:
+    names = _class_and_id(tag)
+    weight = 0
+    if POSITIVE_PATTERN.search(names):
+        weight += 25
+    if NEGATIVE_PATTERN.search(names):
+        weight -= 25
+    return weight
+
+
+def _link_density(tag: Tag) -> float:
+    text_length = len(tag.get_text(strip=True))
+    if not text_length:
+        return 0.0
+    link_length = sum(len(a.get_text(strip=True)) for a in tag.find_all("a"))
+    return link_length / text_length
+
+
+def count_blocks(root: Tag) -> int:
+    """Blocks process_article would analyze (outermost block elements only)."""
+    return sum(
+        1 for block in root.find_all(BLOCK_TAGS)
+        if not any(p.name in BLOCK_TAGS for p in block.parents)
+    )
+
+
+def _strip_chrome(soup: BeautifulSoup):
+    for tag in soup.find_all(REMOVE_TAGS):
+        tag.decompose()
+    for tag in soup.find_all(True):
+        if tag.decomposed or tag.name in PROTECTED_TAGS or tag.attrs is None:
+            continue
+        names = _class_and_id(tag)
+        if UNLIKELY_PATTERN.search(names) and not MAYBE_CANDIDATE_PATTERN.search(names):
+            tag.decompose()
+
+
+def _best_container(soup: BeautifulSoup) -> Optional[Tag]:
+    scores: Dict[int, Tuple[Tag, float]] = {}
+
+    def add(tag: Optional[Tag], points: float):
+        if tag is None or tag.name in ("[document]", "html"):
+            return
+        if id(tag) not in scores:
+            scores[id(tag)] = (tag, float(_class_weight(tag)))
+        node, score = scores[id(tag)]
+        scores[id(tag)] = (node, score + points)
+
+    for paragraph in soup.find_all(["p", "pre", "td"]):
+        text = paragraph.get_text(" ", strip=True)
+        if len(text) < EXTRACT_MIN_PARAGRAPH_CHARS:
+            continue
+        points = 1 + text.count(",") + min(len(text) // 100, 3)
+        add(paragraph.parent, points)
+        add(paragraph.parent.parent if paragraph.parent else None, points / 2)
+
+    best, best_score = None, 0.0
+    for tag, score in scores.values():
+        score *= 1 - _link_density(tag)
+        if score > best_score:
+            best, best_score = tag, score
+    return best
+
+
+def extract_main_content(soup: BeautifulSoup) -> Tuple[List[Tag], Dict]:
+    """Strips page chrome from the soup in place and returns (roots to analyze, report).
+    The report's estimated time saved is filled in by the caller once per-block cost is known."""
+    start = time.perf_counter()
+    blocks_before = count_blocks(soup)
+
+    _strip_chrome(soup)
+    roots: List[Tag] = [soup]
+    container = _best_container(soup)
+    if container is not None:
+        page_text = len(soup.get_text(strip=True))
+        if page_text and len(container.get_text(strip=True)) / page_text >= EXTRACT_MIN_TEXT_SHARE:
+            roots = [container]
+            # The title usually sits above the article body
+            title = soup.find("h1")
+            if title is not None and container not in title.parents:
+                roots.insert(0, title)
+
+    blocks_after = sum(1 if root.name in BLOCK_TAGS else count_blocks(root) for root in roots)
+    report = {
+        "BlocksBefore": blocks_before,
+        "BlocksAfter": blocks_after,
+        "BlocksDropped": blocks_before - blocks_after,
+        "MainContainer": None if roots[-1] is soup else _describe(roots[-1]),
+        "ExtractionMs": round((time.perf_counter() - start) * 1000, 2),
+    }
+    return roots, report
+
+
+def _describe(tag: Tag) -> str:
+    label = tag.name
+    if tag.get("id"):
+        label += f"#{tag['id']}"
+    if tag.get("class"):
+        label += "." + ".".join(tag["class"])
+    return label
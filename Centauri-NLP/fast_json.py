@@ -0,0 +1,27 @@
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from tracing import span
+
+# orjson is optional; without it responses fall back to the stdlib encoder
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """For endpoints that already hold plain dicts/lists built from trusted internal data:
+    no Pydantic validation or jsonable_encoder pass, just one encoder call."""
+
+    def render(self, content: Any) -> bytes:
+        with span("serialize"):
+            return dumps(content)
@@ -0,0 +1,179 @@
+import atexit
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Grammar verdicts are deterministic per (sentence, checker, checker version), so
+# boilerplate sentences (CTAs, disclaimers, repeated intros) only need checking once.
+# In-memory LRU in front, SQLite file behind it (shared by every process on the box), opened
+# on first use. The default file sits next to this module whatever the working directory;
+# GRAMMAR_CACHE_PATH="" keeps the cache in memory only.
+GRAMMAR_CACHE_PATH = os.environ.get(
+    "GRAMMAR_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "grammar_cache.db")
+)
+GRAMMAR_CACHE_SIZE = int(os.environ.get("GRAMMAR_CACHE_SIZE", "50000"))
+# Single-sentence verdicts (get_or_check) are written to SQLite in batches: once this many are
+# pending, once the oldest is this old, with the next put_many, or at exit
+GRAMMAR_CACHE_FLUSH_ROWS = int(os.environ.get("GRAMMAR_CACHE_FLUSH_ROWS", "256"))
+GRAMMAR_CACHE_FLUSH_SECONDS = float(os.environ.get("GRAMMAR_CACHE_FLUSH_SECONDS", "5"))
+# Seconds a writer waits for another process's transaction (bulk_score workers share the file)
+GRAMMAR_CACHE_BUSY_TIMEOUT = float(os.environ.get("GRAMMAR_CACHE_BUSY_TIMEOUT", "30"))
+
+
+def normalize_sentence(text: str) -> str:
+    # Only Unicode form and outer whitespace are normalized: LanguageTool flags
+    # doubled inner spaces, so collapsing them would change the verdict.
+    return unicodedata.normalize("NFC", text or "").strip()
+
+
+def verdict_key(text: str, checker: str, version: str) -> str:
+    raw = f"{checker}\x1f{version}\x1f{normalize_sentence(text)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class GrammarVerdictCache:
+    def __init__(self, path: str = GRAMMAR_CACHE_PATH, max_entries: int = GRAMMAR_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, bool]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0, "write_errors": 0}
+        self._pending: List[Tuple[str, str, str, int]] = []
+        self._pending_since = 0.0
+
+        self.path = path
+        self._db = None
+
+    def _database(self) -> Optional[sqlite3.Connection]:
+        """The SQLite connection, opened on first use (None when the cache is memory-only)."""
+        if self._db is None and self.path:
+            db = sqlite3.connect(self.path, check_same_thread=False, timeout=GRAMMAR_CACHE_BUSY_TIMEOUT)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS grammar_verdicts ("
+                "key TEXT PRIMARY KEY, checker TEXT NOT NULL, version TEXT NOT NULL, ok INTEGER NOT NULL)"
+            )
+            db.commit()
+            self._db = db
+        return self._db
+
+    # ----------- LRU FRONT -----------
+
+    def _remember(self, key: str, ok: bool):
+        self._memory[key] = ok
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    # ----------- LOOKUP / STORE -----------
+
+    def get_many(self, texts: List[str], checker: str, version: str) -> List[Optional[bool]]:
+        keys = [verdict_key(t, checker, version) for t in texts]
+        results: List[Optional[bool]] = [None] * len(texts)
+        with self._lock:
+            disk_lookup = []
+            for i, key in enumerate(keys):
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    results[i] = self._memory[key]
+                    self._stats["memory_hits"] += 1
+                else:
+                    disk_lookup.append(i)
+
+            if disk_lookup and self.path:
+                wanted = {keys[i] for i in disk_lookup}
+                found: Dict[str, bool] = {}
+                wanted_list = list(wanted)
+                try:
+                    db = self._database()
+                    # SQLite caps the number of bound parameters per statement
+                    for start in range(0, len(wanted_list), 500):
+                        batch = wanted_list[start:start + 500]
+                        placeholders = ",".join("?" * len(batch))
+                        rows = db.execute(
+                            f"SELECT key, ok FROM grammar_verdicts WHERE key IN ({placeholders})", batch
+                        ).fetchall()
+                        found.update((k, bool(ok)) for k, ok in rows)
+                except sqlite3.OperationalError:
+                    pass  # e.g. still locked after the busy timeout: the verdicts are simply rechecked
+                for i in disk_lookup:
+                    if keys[i] in found:
+                        results[i] = found[keys[i]]
+                        self._remember(keys[i], results[i])
+                        self._stats["disk_hits"] += 1
+
+            self._stats["misses"] += sum(1 for r in results if r is None)
+        return results
+
+    def put_many(self, items: Iterable[Tuple[str, bool]], checker: str, version: str, defer: bool = False):
+        """Stores verdicts; the SQLite write is one transaction per call (with anything pending),
+        or with defer=True left for a later batch."""
+        rows = [(verdict_key(t, checker, version), checker, version, int(ok)) for t, ok in items]
+        if not rows:
+            return
+        with self._lock:
+            for key, _, _, ok in rows:
+                self._remember(key, bool(ok))
+            self._stats["writes"] += len(rows)
+            if not self.path:
+                return
+            if not self._pending:
+                self._pending_since = time.monotonic()
+            self._pending.extend(rows)
+            if defer and len(self._pending) < GRAMMAR_CACHE_FLUSH_ROWS \
+                    and time.monotonic() - self._pending_since < GRAMMAR_CACHE_FLUSH_SECONDS:
+                return
+            self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        rows, self._pending = self._pending, []
+        try:
+            db = self._database()
+            with db:
+                db.executemany("INSERT OR REPLACE INTO grammar_verdicts VALUES (?, ?, ?, ?)", rows)
+        except sqlite3.OperationalError:
+            # The cache is best effort: a write that still finds the file locked is dropped
+            self._stats["write_errors"] += len(rows)
+
+    def get(self, text: str, checker: str, version: str) -> Optional[bool]:
+        return self.get_many([text], checker, version)[0]
+
+    def put(self, text: str, checker: str, version: str, ok: bool, defer: bool = False):
+        self.put_many([(text, ok)], checker, version, defer=defer)
+
+    def get_or_check(self, text: str, checker: str, version: str, check_fn: Callable[[], bool]) -> bool:
+        cached = self.get(text, checker, version)
+        if cached is not None:
+            return cached
+        ok = bool(check_fn())
+        self.put(text, checker, version, ok, defer=True)
+        return ok
+
+    # ----------- METRICS -----------
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            stats["pending_writes"] = len(self._pending)
+            if self._db is not None:
+                stats["disk_entries"] = self._db.execute("SELECT COUNT(*) FROM grammar_verdicts").fetchone()[0]
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+# One cache per process, shared by every checker that imports it
+grammar_cache = GrammarVerdictCache()
+atexit.register(grammar_cache.flush)
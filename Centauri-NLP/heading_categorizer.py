@@ -0,0 +1,167 @@
+import os
+import random
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Fast path in front of the LLM: headings are embedded with the sentence-transformer and
+# labelled by the nearest category prototype (mean embedding of headings the LLM already
+# categorized). Only headings below the confidence/margin bar fall through to Ollama.
+HEADING_ENCODER_MODEL = os.environ.get("HEADING_ENCODER_MODEL", "all-mpnet-base-v2")
+HEADING_MIN_CONFIDENCE = float(os.environ.get("HEADING_MIN_CONFIDENCE", "0.55"))
+HEADING_MIN_MARGIN = float(os.environ.get("HEADING_MIN_MARGIN", "0.05"))
+# Categories with fewer cached examples than this get no prototype
+HEADING_MIN_EXAMPLES = int(os.environ.get("HEADING_MIN_EXAMPLES", "3"))
+
+
+def load_encoder(name: str = HEADING_ENCODER_MODEL):
+    # Same registry entry nlp_service.py uses for /get-subtopics, so a combined app loads it once
+    from model_registry import registry, sentence_transformer_loader
+    registry.register(name, sentence_transformer_loader(name), size_mb=500)
+    return registry.proxy(name)
+
+
+class PrototypeHeadingCategorizer:
+    def __init__(
+        self,
+        encoder,
+        min_confidence: float = HEADING_MIN_CONFIDENCE,
+        min_margin: float = HEADING_MIN_MARGIN,
+        min_examples: int = HEADING_MIN_EXAMPLES,
+    ):
+        self.encoder = encoder
+        self.min_confidence = min_confidence
+        self.min_margin = min_margin
+        self.min_examples = min_examples
+        # (labels, prototype matrix) swapped as one tuple so a retrain never races predict()
+        self._model: Tuple[List[str], Optional[np.ndarray]] = ([], None)
+        self.report: Dict[str, float] = {}
+
+    def _embed(self, headings: Sequence[str]) -> np.ndarray:
+        return np.asarray(self.encoder.encode(list(headings), normalize_embeddings=True, convert_to_numpy=True))
+
+    @property
+    def labels(self) -> List[str]:
+        return self._model[0]
+
+    @property
+    def is_trained(self) -> bool:
+        labels, prototypes = self._model
+        return prototypes is not None and len(labels) >= 2
+
+    def fit(self, examples: Sequence[Tuple[str, str]], embeddings: Optional[np.ndarray] = None):
+        """examples: (heading, category) pairs, typically cached LLM answers."""
+        # LLM spelling varies ("faq", "FAQ"); group case-insensitively, keep the common spelling
+        spellings = defaultdict(Counter)
+        for _, category in examples:
+            spellings[category.strip().casefold()][category.strip()] += 1
+        canonical = {key: c.most_common(1)[0][0] for key, c in spellings.items()}
+
+        if embeddings is None:
+            embeddings = self._embed([h for h, _ in examples]) if examples else np.zeros((0, 0))
+        rows = defaultdict(list)
+        for i, (_, category) in enumerate(examples):
+            rows[canonical[category.strip().casefold()]].append(i)
+
+        labels, prototypes = [], []
+        for label, idx in sorted(rows.items()):
+            if len(idx) < self.min_examples:
+                continue
+            centroid = embeddings[idx].mean(axis=0)
+            norm = np.linalg.norm(centroid)
+            if norm:
+                labels.append(label)
+                prototypes.append(centroid / norm)
+
+        self._model = (labels, np.stack(prototypes) if prototypes else None)
+        return self
+
+    @staticmethod
+    def _scores(embeddings: np.ndarray, prototypes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        sims = embeddings @ prototypes.T
+        order = np.argsort(-sims, axis=1)
+        best = sims[np.arange(len(sims)), order[:, 0]]
+        second = sims[np.arange(len(sims)), order[:, 1]] if sims.shape[1] > 1 else np.zeros(len(sims))
+        return order[:, 0], best, best - second
+
+    def predict(self, headings: Sequence[str], embeddings: Optional[np.ndarray] = None) -> List[Tuple[Optional[str], float]]:
+        """(category or None when not confident, confidence) for each heading."""
+        labels, prototypes = self._model
+        if prototypes is None or len(labels) < 2 or not headings:
+            return [(None, 0.0) for _ in headings]
+        if embeddings is None:
+            embeddings = self._embed(headings)
+        best_idx, best, margin = self._scores(embeddings, prototypes)
+        return [
+            (labels[i] if b >= self.min_confidence and m >= self.min_margin else None, float(b))
+            for i, b, m in zip(best_idx, best, margin)
+        ]
+
+    def categorize_confident(self, headings: List[str]) -> Dict[str, str]:
+        """Fast-path hook for the Ollama clients: only confident answers are returned."""
+        return {h: label for h, (label, _) in zip(headings, self.predict(headings)) if label is not None}
+
+    def evaluate(self, examples: Sequence[Tuple[str, str]], folds: int = 5, seed: int = 13) -> Dict[str, float]:
+        """k-fold agreement with the LLM labels. coverage = share answered by the fast path,
+        agreement = share of those answers equal to the LLM's."""
+        examples = list(examples)
+        if len(examples) < folds * 2:
+            return {"examples": len(examples), "coverage": 0.0, "agreement": 0.0}
+        embeddings = self._embed([h for h, _ in examples])
+        order = list(range(len(examples)))
+        random.Random(seed).shuffle(order)
+
+        answered = agreed = 0
+        probe = PrototypeHeadingCategorizer(self.encoder, self.min_confidence, self.min_margin, self.min_examples)
+        for k in range(folds):
+            test = order[k::folds]
+            test_set = set(test)
+            train = [i for i in order if i not in test_set]
+            probe.fit([examples[i] for i in train], embeddings[train])
+            predictions = probe.predict([examples[i][0] for i in test], embeddings[test])
+            for i, (label, _) in zip(test, predictions):
+                if label is None:
+                    continue
+                answered += 1
+                agreed += label.casefold() == examples[i][1].strip().casefold()
+
+        return {
+            "examples": len(examples),
+            "coverage": round(answered / len(examples), 4),
+            "agreement": round(agreed / answered, 4) if answered else 0.0,
+        }
+
+    def train_from_cache(self, cache) -> Dict[str, float]:
+        """Fits on every cached LLM answer and records the cross-validated agreement."""
+        examples = cache.items()
+        self.report = self.evaluate(examples)
+        self.fit(examples)
+        self.report["categories"] = len(self.labels)
+        return self.report
+
+
+if __name__ == "__main__":
+    # Agreement report against the cached LLM answers:  python heading_categorizer.py
+    from ollama_client import HeadingCategoryCache
+
+    cache = HeadingCategoryCache()
+    examples = cache.items()
+    categorizer = PrototypeHeadingCategorizer(load_encoder())
+    print(f"Cached LLM answers: {len(examples)}")
+
+    print(f"{'min_confidence':>14} | {'coverage':>8} | {'agreement':>9}")
+    print("-" * 38)
+    for threshold in (0.35, 0.45, 0.55, 0.65, 0.75):
+        categorizer.min_confidence = threshold
+        report = categorizer.evaluate(examples)
+        print(f"{threshold:>14.2f} | {report['coverage']:>8.2%} | {report['agreement']:>9.2%}")
+
+    categorizer.min_confidence = HEADING_MIN_CONFIDENCE
+    categorizer.fit(examples)
+    sample = [h for h, _ in examples[:200]] or ["What is a 1099?"]
+    start = time.perf_counter()
+    categorizer.predict(sample)
+    elapsed = time.perf_counter() - start
+    print(f"Fast-path latency: {elapsed * 1000 / len(sample):.2f} ms/heading over {len(sample)} headings")
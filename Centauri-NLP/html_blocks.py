@@ -0,0 +1,108 @@
+import os
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+# Bounded-memory block reader for large /process-article inputs. HTML is fed in chunks and
+# the outermost block elements (same set as is_block_element) come out as (tag, text) as
+# soon as they close, so neither the document nor a DOM tree is ever held in memory.
+BLOCK_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6", "p", "li", "td", "th"}
+# Paragraphs and headings can't contain other blocks; a new block start closes them
+SELF_CLOSING_BLOCKS = {"h1", "h2", "h3", "h4", "h5", "h6", "p"}
+SKIP_TAGS = {"script", "style", "noscript", "template"}
+
+# Per-request limits; requests may lower them but never raise them
+ARTICLE_MAX_BYTES = int(os.environ.get("ARTICLE_MAX_BYTES", str(5 * 1024 * 1024)))
+ARTICLE_MAX_BLOCKS = int(os.environ.get("ARTICLE_MAX_BLOCKS", "5000"))
+ARTICLE_MAX_SENTENCES = int(os.environ.get("ARTICLE_MAX_SENTENCES", "20000"))
+ARTICLE_STREAM_CHUNK_BYTES = int(os.environ.get("ARTICLE_STREAM_CHUNK_BYTES", "65536"))
+
+
+def resolve_limits(max_bytes: Optional[int] = None, max_blocks: Optional[int] = None,
+                   max_sentences: Optional[int] = None) -> Tuple[int, int, int]:
+    def pick(requested, ceiling):
+        return min(requested, ceiling) if requested and requested > 0 else ceiling
+    return (
+        pick(max_bytes, ARTICLE_MAX_BYTES),
+        pick(max_blocks, ARTICLE_MAX_BLOCKS),
+        pick(max_sentences, ARTICLE_MAX_SENTENCES),
+    )
+
+
+class BlockStreamParser(HTMLParser):
+    """feed() HTML chunks, then take the finished blocks with pop_blocks().
+    Block text is capped at max_block_chars (spaCy's nlp.max_length)."""
+
+    def __init__(self, max_block_chars: int = 1_000_000):
+        super().__init__(convert_charrefs=True)
+        self.max_block_chars = max_block_chars
+        self._blocks: List[Tuple[str, str]] = []
+        self._tag: Optional[str] = None
+        self._depth = 0  # nesting of the current block's own tag (li inside li)
+        self._parts: List[str] = []
+        self._pending: List[str] = []  # current text node, which may span several feed() chunks
+        self._pending_chars = 0
+        self._chars = 0
+        self._skip = 0
+        self.clipped_blocks = 0
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        if tag in SKIP_TAGS:
+            self._skip += 1
+        elif tag in BLOCK_TAGS:
+            if self._tag is None:
+                self._open(tag)
+            elif self._tag in SELF_CLOSING_BLOCKS:
+                self._close()
+                self._open(tag)
+            elif tag == self._tag:
+                self._depth += 1
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        if tag in SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag == self._tag:
+            self._depth -= 1
+            if self._depth == 0:
+                self._close()
+
+    def handle_data(self, data):
+        if self._tag is None or self._skip:
+            return
+        if self._chars + self._pending_chars < self.max_block_chars:
+            self._pending.append(data)
+            self._pending_chars += len(data)
+
+    def _flush_text(self):
+        text = "".join(self._pending).strip()
+        self._pending, self._pending_chars = [], 0
+        if not text:
+            return
+        room = self.max_block_chars - self._chars
+        if room <= 0:
+            return
+        if len(text) > room:
+            text = text[:room]
+            self.clipped_blocks += 1
+        self._parts.append(text)
+        self._chars += len(text) + 1
+
+    def _open(self, tag):
+        self._tag, self._depth, self._parts, self._chars = tag, 1, [], 0
+
+    def _close(self):
+        text = " ".join(self._parts)
+        if text:
+            self._blocks.append((self._tag, text))
+        self._tag, self._depth, self._parts, self._chars = None, 0, [], 0
+
+    def close(self):
+        super().close()
+        self._flush_text()
+        if self._tag is not None:
+            self._close()
+
+    def pop_blocks(self) -> List[Tuple[str, str]]:
+        blocks, self._blocks = self._blocks, []
+        return blocks
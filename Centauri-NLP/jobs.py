@@ -0,0 +1,228 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+# Background jobs for analyses that can outlive an HTTP timeout (SeoController gives
+# /process-article 30s). Jobs run on in-process worker threads; with JOB_STORE_PATH set
+# they are also written to SQLite, and queued or interrupted jobs are re-run after a restart.
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+# Finished and failed jobs (with their results) are dropped after this many seconds
+JOB_RETENTION_SECONDS = int(os.environ.get("JOB_RETENTION_SECONDS", "3600"))
+# Empty keeps jobs in memory only
+JOB_STORE_PATH = os.environ.get("JOB_STORE_PATH", "")
+# Running jobs write their progress to the store at most this often
+JOB_PROGRESS_SAVE_SECONDS = float(os.environ.get("JOB_PROGRESS_SAVE_SECONDS", "2"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+# handler(payload, progress) -> result; progress(done, total)
+Handler = Callable[[Dict[str, Any], Callable[[int, int], None]], Any]
+
+
+class _Job:
+    __slots__ = ("id", "kind", "payload", "status", "done", "total", "result", "error", "created", "updated")
+
+    def __init__(self, job_id: str, kind: str, payload: Dict[str, Any], status: str = QUEUED,
+                 created: Optional[float] = None):
+        self.id = job_id
+        self.kind = kind
+        self.payload = payload
+        self.status = status
+        self.done = 0
+        self.total = None
+        self.result = None
+        self.error = None
+        self.created = created or time.time()
+        self.updated = self.created
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "jobId": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": {"done": self.done, "total": self.total},
+            "result": self.result,
+            "error": self.error,
+            "createdAt": self.created,
+            "updatedAt": self.updated,
+        }
+
+
+class JobManager:
+    def __init__(self, workers: int = JOB_WORKERS, retention_seconds: int = JOB_RETENTION_SECONDS,
+                 store_path: str = JOB_STORE_PATH):
+        self.workers = workers
+        self.retention_seconds = retention_seconds
+        self._handlers: Dict[str, Handler] = {}
+        self._jobs: Dict[str, _Job] = {}
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._db = None
+        if store_path:
+            self._db = sqlite3.connect(store_path, check_same_thread=False, timeout=30)
+            self._db.executescript(
+                "PRAGMA journal_mode=WAL;"
+                "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL,"
+                " payload TEXT NOT NULL, result TEXT, error TEXT, done INTEGER, total INTEGER,"
+                " created REAL NOT NULL, updated REAL NOT NULL);"
+            )
+            self._db.commit()
+
+    def register(self, kind: str, handler: Handler):
+        self._handlers[kind] = handler
+
+    # ----------- LIFECYCLE -----------
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            self._restore()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self):
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout=5)
+
+    def _restore(self):
+        if self._db is None:
+            return
+        rows = self._db.execute(
+            "SELECT id, kind, status, payload, result, error, done, total, created, updated FROM jobs"
+        ).fetchall()
+        for job_id, kind, status, payload, result, error, done, total, created, updated in rows:
+            job = _Job(job_id, kind, json.loads(payload), status, created)
+            job.result = json.loads(result) if result else None
+            job.error, job.done, job.total, job.updated = error, done or 0, total, updated
+            self._jobs[job_id] = job
+            if status in (QUEUED, RUNNING):
+                # Interrupted by the restart: run again from the start
+                job.status, job.done = QUEUED, 0
+                self._queue.put(job_id)
+
+    # ----------- PUBLIC API -----------
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if kind not in self._handlers:
+            raise KeyError(f"No handler registered for job kind '{kind}'")
+        self.start()
+        self._purge()
+        job = _Job(uuid.uuid4().hex, kind, payload)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._save(job, payload=True)
+        self._queue.put(job.id)
+        return job.to_dict()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self._purge()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return {"workers": self.workers, "persistent": self._db is not None, **counts}
+
+    # ----------- WORKERS -----------
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            try:
+                self._run(job_id)
+            except Exception as e:
+                # Never lose the worker: the job is failed and the loop goes on
+                print(f"Job {job_id} worker error: {e}\n{traceback.format_exc()}")
+
+    def _run(self, job_id: str):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != QUEUED:
+                return
+            job.status, job.updated = RUNNING, time.time()
+        self._store(job)
+        last_saved = time.monotonic()
+
+        def progress(done: int, total: int):
+            nonlocal last_saved
+            job.done, job.total = done, total
+            if self._db is not None and time.monotonic() - last_saved >= JOB_PROGRESS_SAVE_SECONDS:
+                last_saved = time.monotonic()
+                self._store(job, progress_only=True)
+
+        try:
+            result = self._handlers[job.kind](job.payload, progress)
+            status, error = DONE, None
+        except Exception as e:
+            print(f"Job {job.id} failed: {e}\n{traceback.format_exc()}")
+            result, status, error = None, FAILED, str(e)
+        with self._lock:
+            job.result, job.status, job.error, job.updated = result, status, error, time.time()
+        store_error = self._store(job)
+        if store_error and status == DONE:
+            # e.g. a result json.dumps cannot encode: fail the job instead of leaving it "running"
+            with self._lock:
+                job.result, job.status, job.updated = None, FAILED, time.time()
+                job.error = f"The result could not be stored: {store_error}"
+            self._store(job)
+
+    # ----------- STORAGE / RETENTION -----------
+
+    def _save(self, job: _Job, payload: bool = False, progress_only: bool = False):
+        # Caller holds self._lock
+        if self._db is None:
+            return
+        with self._db:
+            if payload:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job.id, job.kind, job.status, json.dumps(job.payload), None, None, 0, None, job.created, job.updated),
+                )
+            elif progress_only:
+                self._db.execute("UPDATE jobs SET done = ?, total = ? WHERE id = ?", (job.done, job.total, job.id))
+            else:
+                self._db.execute(
+                    "UPDATE jobs SET status = ?, result = ?, error = ?, done = ?, total = ?, updated = ? WHERE id = ?",
+                    (job.status, json.dumps(job.result) if job.result is not None else None, job.error,
+                     job.done, job.total, job.updated, job.id),
+                )
+
+    def _store(self, job: _Job, progress_only: bool = False) -> Optional[str]:
+        """_save from a worker; a storage error is logged and returned, never raised."""
+        try:
+            with self._lock:
+                self._save(job, progress_only=progress_only)
+            return None
+        except Exception as e:
+            print(f"Job {job.id}: could not store its state: {e}")
+            return str(e)
+
+    def _purge(self):
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            expired = [j.id for j in self._jobs.values() if j.status in (DONE, FAILED) and j.updated < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+            if expired and self._db is not None:
+                self._db.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in expired])
+                self._db.commit()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python
+# Load generator for the NLP service: replays production-shaped payloads at a fixed
+# concurrency (closed loop) or arrival rate (open loop) and reports throughput, latency
+# percentiles, error rate and server RSS over time.
+#
+#   python loadtest.py --spawn --duration 60 --concurrency 8
+#   python loadtest.py --url http://localhost:8000 --rate 20 --mix similarity=10,similarity-batch=4,process-article=1
+#   python loadtest.py --spawn --articles samples/ --out results/build-123.json --compare results/build-122.json
+#
+# Built-in scenarios are derived from test_request.json (the SeoController / SectionScorer
+# request shapes). --articles adds recorded HTML articles for process-article, and
+# --payloads adds recorded requests (JSONL lines {"scenario", "path", "body"}).
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+DEFAULT_PORT = 8011
+DEFAULT_MIX = "similarity=10,similarity-batch=4,get-subtopics=1,analyze=2,process-article=1"
+READY_TIMEOUT_SECONDS = 300
+RSS_SAMPLE_SECONDS = 1.0
+# SectionScorer sends every heading x sentence pair of an article in one batch
+SIMILARITY_BATCH_ITEMS = 60
+SUBTOPIC_COMPETITORS = 10
+
+
+# ----------- PAYLOADS -----------
+
+def base_request() -> Dict:
+    with open(Path(__file__).with_name("test_request.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def article_html(request: Dict, repeat: int = 8) -> str:
+    sections = "".join(
+        f"<h2>{s['SectionText']}</h2>" + "".join(f"<p>{sentence}</p>" for sentence in s["Sentences"])
+        for s in request["sections"]
+    )
+    return f"<html><body><h1>{request['PrimaryKeyword']}</h1>{sections * repeat}</body></html>"
+
+
+def builtin_payloads(articles: Optional[Path]) -> Dict[str, List[Dict]]:
+    request = base_request()
+    keyword = request["PrimaryKeyword"]
+    headings = [s["SectionText"] for s in request["sections"]]
+    sentences = [t for s in request["sections"] for t in s["Sentences"]]
+    pairs = list(itertools.islice(itertools.cycle(itertools.product(headings, sentences)), SIMILARITY_BATCH_ITEMS))
+
+    htmls = [article_html(request)]
+    if articles:
+        htmls = [p.read_text(encoding="utf-8", errors="ignore") for p in sorted(articles.glob("*.htm*"))] or htmls
+
+    return {
+        "similarity": [{"path": "/similarity", "body": {"text1": a, "text2": b}} for a, b in pairs[:10]],
+        "similarity-batch": [{"path": "/similarity/batch", "body": {"items": [{"text1": a, "text2": b} for a, b in pairs]}}],
+        "get-subtopics": [{"path": "/get-subtopics", "body": {"data": [
+            {"Headings": headings + [f"{h} ({i})" for h in headings], "Url": f"https://example.com/{i}", "Intent": 0}
+            for i in range(SUBTOPIC_COMPETITORS)
+        ]}}],
+        "analyze": [{"path": "/analyze", "body": {
+            "sentences": [{"Id": f"S{i + 1}", "Text": t} for i, t in enumerate(sentences * 10)],
+            "primaryKeyword": keyword,
+        }}],
+        "process-article": [{"path": "/process-article", "body": {"htmlContent": h, "primaryKeyword": keyword}} for h in htmls],
+        "recommendations": [{"path": "/recommendations-input", "body": request}],
+    }
+
+
+def load_payloads(articles: Optional[Path], recorded: Optional[Path]) -> Dict[str, List[Dict]]:
+    payloads = builtin_payloads(articles)
+    if recorded:
+        with open(recorded, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    item = json.loads(line)
+                    scenario = item.get("scenario") or item["path"].strip("/").replace("/", "-")
+                    payloads.setdefault(scenario, []).append({"path": item["path"], "body": item["body"]})
+    return payloads
+
+
+def parse_mix(mix: str, payloads: Dict[str, List[Dict]]) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in payloads:
+            raise SystemExit(f"Unknown scenario '{name}' (available: {', '.join(sorted(payloads))})")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+# ----------- SERVER / RSS -----------
+
+def spawn_server(port: int) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=Path(__file__).parent,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, url: str, server: Optional[subprocess.Popen]):
+    deadline = time.monotonic() + READY_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if server is not None and server.poll() is not None:
+            raise SystemExit(f"Server exited with code {server.returncode}")
+        try:
+            if (await client.get(f"{url}/openapi.json")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.5)
+    raise SystemExit(f"Server at {url} not ready after {READY_TIMEOUT_SECONDS}s")
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+async def sample_rss(pid: int, started: float, samples: List, stop: asyncio.Event):
+    while not stop.is_set():
+        value = rss_mb(pid)
+        if value is not None:
+            samples.append((round(time.perf_counter() - started, 2), round(value, 1)))
+        try:
+            await asyncio.wait_for(stop.wait(), RSS_SAMPLE_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+
+# ----------- LOAD -----------
+
+class Recorder:
+    def __init__(self):
+        # scenario -> [(latency ms, ok)]
+        self.results: Dict[str, List] = {}
+        self.recording = False
+
+    def add(self, scenario: str, ms: float, ok: bool):
+        if self.recording:
+            self.results.setdefault(scenario, []).append((ms, ok))
+
+
+async def send(client: httpx.AsyncClient, url: str, scenario: str, payload: Dict, recorder: Recorder):
+    start = time.perf_counter()
+    try:
+        response = await client.post(url + payload["path"], json=payload["body"])
+        ok = response.status_code < 400
+    except httpx.HTTPError:
+        ok = False
+    recorder.add(scenario, (time.perf_counter() - start) * 1000, ok)
+
+
+def picker(payloads: Dict[str, List[Dict]], weights: Dict[str, float], rng: random.Random):
+    names, values = list(weights), list(weights.values())
+
+    def pick():
+        scenario = rng.choices(names, values)[0]
+        return scenario, rng.choice(payloads[scenario])
+    return pick
+
+
+async def closed_loop(client, url, pick, recorder, concurrency: int, until: float):
+    async def worker():
+        while time.perf_counter() < until:
+            await send(client, url, *pick(), recorder)
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def open_loop(client, url, pick, recorder, rate: float, concurrency: int, until: float, rng: random.Random):
+    """Poisson arrivals at `rate`/s; at most `concurrency` in flight, later arrivals are
+    counted as errors (client-side overload) instead of silently slowing the arrival rate."""
+    in_flight = set()
+    next_arrival = time.perf_counter()
+    while next_arrival < until:
+        await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+        scenario, payload = pick()
+        if len(in_flight) >= concurrency:
+            recorder.add(scenario, 0.0, False)
+        else:
+            task = asyncio.create_task(send(client, url, scenario, payload, recorder))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        next_arrival += rng.expovariate(rate)
+    if in_flight:
+        await asyncio.gather(*in_flight)
+
+
+# ----------- REPORT -----------
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples: List, seconds: float) -> Dict:
+    latencies = sorted(ms for ms, ok in samples if ok)
+    errors = sum(1 for _, ok in samples if not ok)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "errorRate": round(errors / len(samples), 4) if samples else 0.0,
+        "throughput": round(len(latencies) / seconds, 2) if seconds else 0.0,
+        "p50": round(percentile(latencies, 50), 1),
+        "p95": round(percentile(latencies, 95), 1),
+        "p99": round(percentile(latencies, 99), 1),
+    }
+
+
+def print_report(report: Dict, baseline: Optional[Dict]):
+    print(f"{'scenario':>18} | {'requests':>8} | {'err %':>6} | {'req/s':>7} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8}")
+    print("-" * 82)
+    rows = dict(report["scenarios"], all=report["overall"])
+    for name, s in rows.items():
+        print(f"{name:>18} | {s['requests']:>8} | {s['errorRate']:>6.1%} | {s['throughput']:>7.2f}"
+              f" | {s['p50']:>8.1f} | {s['p95']:>8.1f} | {s['p99']:>8.1f}")
+        base = (baseline or {}).get("scenarios", {}).get(name) if name != "all" else (baseline or {}).get("overall")
+        if base:
+            print(f"{'vs baseline':>18} | {'':>8} | {s['errorRate'] - base['errorRate']:>+6.1%}"
+                  f" | {s['throughput'] - base['throughput']:>+7.2f} | {s['p50'] - base['p50']:>+8.1f}"
+                  f" | {s['p95'] - base['p95']:>+8.1f} | {s['p99'] - base['p99']:>+8.1f}")
+    rss = report["rss"]
+    if rss["samples"]:
+        values = [mb for _, mb in rss["samples"]]
+        print(f"server RSS: start {values[0]:.0f} MB, peak {max(values):.0f} MB, end {values[-1]:.0f} MB")
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).parent,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> Dict:
+    payloads = load_payloads(args.articles, args.payloads)
+    weights = parse_mix(args.mix, payloads)
+    rng = random.Random(args.seed)
+    pick = picker(payloads, weights, rng)
+    server = spawn_server(args.port) if args.spawn else None
+    url = args.url or f"http://127.0.0.1:{args.port}"
+    pid = server.pid if server is not None else args.pid
+    recorder, rss_samples, stop = Recorder(), [], asyncio.Event()
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    headers = {"X-Priority": args.priority} if args.priority else None
+    try:
+        async with httpx.AsyncClient(timeout=args.timeout, limits=limits, headers=headers) as client:
+            await wait_ready(client, url, server)
+            started = time.perf_counter()
+            rss_task = asyncio.create_task(sample_rss(pid, started, rss_samples, stop)) if pid else None
+            for phase, seconds in (("warmup", args.warmup), ("measure", args.duration)):
+                recorder.recording = phase == "measure"
+                phase_start = time.perf_counter()
+                until = phase_start + seconds
+                if args.rate:
+                    await open_loop(client, url, pick, recorder, args.rate, args.concurrency, until, rng)
+                else:
+                    await closed_loop(client, url, pick, recorder, args.concurrency, until)
+            measured = time.perf_counter() - phase_start
+            stop.set()
+            if rss_task:
+                await rss_task
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    all_samples = [s for samples in recorder.results.values() for s in samples]
+    return {
+        "startedAt": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": git_revision(),
+        "config": {
+            "url": url, "mix": weights, "concurrency": args.concurrency, "rate": args.rate,
+            "duration": args.duration, "warmup": args.warmup, "seed": args.seed, "priority": args.priority,
+        },
+        "scenarios": {name: summarize(samples, measured) for name, samples in sorted(recorder.results.items())},
+        "overall": summarize(all_samples, measured),
+        "rss": {"pid": pid, "samples": rss_samples},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the Centauri NLP service.")
+    parser.add_argument("--url", help="running service (default: the --spawn server)")
+    parser.add_argument("--spawn", action="store_true", help="start 'uvicorn main:app' for the run")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port for --spawn")
+    parser.add_argument("--pid", type=int, help="server process to sample RSS from (automatic with --spawn)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario=weight,... (default: %(default)s)")
+    parser.add_argument("--concurrency", type=int, default=8, help="workers (closed loop) or max in flight (with --rate)")
+    parser.add_argument("--rate", type=float, help="arrivals per second (open loop); default is closed loop")
+    parser.add_argument("--duration", type=float, default=60, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=10, help="unmeasured seconds before the run")
+    parser.add_argument("--timeout", type=float, default=120, help="per-request timeout in seconds")
+    parser.add_argument("--articles", type=Path, help="directory of recorded .html articles for process-article")
+    parser.add_argument("--payloads", type=Path, help='recorded requests, JSONL {"scenario", "path", "body"}')
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--priority", choices=["interactive", "bulk"], help="admission lane (X-Priority header)")
+    parser.add_argument("--out", type=Path, help="save the results JSON here")
+    parser.add_argument("--compare", type=Path, help="earlier results JSON to print deltas against")
+    args = parser.parse_args(argv)
+    if not args.url and not args.spawn:
+        parser.error("give --url or --spawn")
+
+    report = asyncio.run(run(args))
+    baseline = json.loads(args.compare.read_text(encoding="utf-8")) if args.compare else None
+    print_report(report, baseline)
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Saved {args.out}")
+    return 1 if report["overall"]["errorRate"] > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+# All Centauri NLP services in one process, sharing one set of loaded models:
+#   uvicorn main:app --host 0.0.0.0 --port 8000
+# Each service still runs on its own as before (app.py, seo-analysis.py, nlp_service.py, ollama.py).
+# CENTAURI_SERVICES picks which ones to mount, e.g. "nlp,seo" (default: all).
+import importlib
+import importlib.util
+import os
+from pathlib import Path
+
+from fastapi import FastAPI
+
+from model_registry import registry
+from admission import AdmissionMiddleware
+from tracing import TracingMiddleware
+
+SERVICES = {
+    "nlp": "nlp_service",
+    "seo": "seo-analysis.py",
+    "tagger": "app",
+    "categorizer": "ollama",
+}
+ENABLED_SERVICES = [s.strip() for s in os.environ.get("CENTAURI_SERVICES", ",".join(SERVICES)).split(",") if s.strip()]
+
+
+def load_service(target: str):
+    if target.endswith(".py"):
+        # seo-analysis.py is not an importable module name
+        path = Path(__file__).with_name(target)
+        spec = importlib.util.spec_from_file_location(path.stem.replace("-", "_"), path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    return importlib.import_module(target)
+
+
+app = FastAPI(title="Centauri NLP - Combined Services")
+# Interactive/bulk lanes with bounded queues (503 + Retry-After when full); added first so
+# tracing wraps it and the time spent queued shows up as the "queue" stage
+app.add_middleware(AdmissionMiddleware)
+# CorrelationId propagation, Server-Timing stage breakdown and sampled timing logs
+app.add_middleware(TracingMiddleware)
+
+for service in ENABLED_SERVICES:
+    # include_router also merges each service's lifespan (e.g. the categorizer's HTTP client)
+    app.include_router(load_service(SERVICES[service]).app.router)
+
+
+@app.get("/models")
+def models():
+    return registry.stats()
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,284 @@
+import gc
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+# Every heavy model (spaCy pipelines, sentence-transformers, the LanguageTool JVM) is owned
+# by one registry per process. When the tagger, analyzer, NLP service and categorizer are
+# mounted together (main.py) they all share the same loaded instances.
+#
+# Models load lazily on first use. Users are reference-counted; with a memory budget
+# (MODEL_MEMORY_BUDGET_MB, 0 = unlimited), loading a model first unloads the least recently
+# used idle models until the estimated total including the new one fits. Models are never
+# unloaded on release, only to make room for another load.
+MODEL_MEMORY_BUDGET_MB = int(os.environ.get("MODEL_MEMORY_BUDGET_MB", "0"))
+# Directory written by build_pruned_vectors.py. When set, en_core_web_lg loads that pruned
+# table memory-mapped read-only instead of its own, so all workers share the same pages.
+SPACY_VECTORS_PATH = os.environ.get("SPACY_VECTORS_PATH", "")
+# Model behind the "lite" analysis profile (loaded without its parser, see spacy_lite_loader).
+# Relevance is compared against ANSWER_RELEVANCE_THRESHOLD, calibrated on en_core_web_lg's
+# vectors, so lite needs word vectors from the same table: en_core_web_md ships a pruned copy
+# of it, and with SPACY_VECTORS_PATH set the pruned lg table is attached to any lite model
+# (so en_core_web_sm works too). A lite model left without vectors fails to load.
+LITE_SPACY_MODEL = os.environ.get("LITE_SPACY_MODEL", "en_core_web_md")
+LITE_PIPELINE = f"{LITE_SPACY_MODEL}:lite"
+
+
+class _Entry:
+    def __init__(self, name: str, loader: Callable[[], Any], size_mb: int, unloader: Optional[Callable[[Any], None]]):
+        self.name = name
+        self.loader = loader
+        self.size_mb = size_mb
+        self.unloader = unloader
+        self.instance = None
+        self.refs = 0
+        self.last_used = 0.0
+        self.loads = 0
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    def __init__(self, memory_budget_mb: int = MODEL_MEMORY_BUDGET_MB):
+        self.memory_budget_mb = memory_budget_mb
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any], size_mb: int = 0,
+                 unloader: Optional[Callable[[Any], None]] = None):
+        """size_mb is the resident size estimate used for the memory budget."""
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = _Entry(name, loader, size_mb, unloader)
+
+    def _entry(self, name: str) -> _Entry:
+        try:
+            return self._entries[name]
+        except KeyError:
+            raise KeyError(f"Model '{name}' is not registered") from None
+
+    def _load(self, entry: _Entry):
+        # Per-model lock: concurrent first requests load the model once
+        with entry.lock:
+            if entry.instance is None:
+                entry.instance = entry.loader()
+                entry.loads += 1
+        return entry.instance
+
+    # ----------- ACQUIRE / RELEASE -----------
+
+    def acquire(self, name: str):
+        """Returns the loaded model and pins it until release(); pinned models are never unloaded."""
+        entry = self._entry(name)
+        with self._lock:
+            entry.refs += 1
+        try:
+            if entry.instance is None:
+                self._enforce_budget(entry)
+            instance = self._load(entry)
+        except Exception:
+            with self._lock:
+                entry.refs -= 1
+            raise
+        entry.last_used = time.monotonic()
+        return instance
+
+    def release(self, name: str):
+        entry = self._entry(name)
+        with self._lock:
+            entry.refs = max(0, entry.refs - 1)
+            entry.last_used = time.monotonic()
+
+    @contextmanager
+    def use(self, name: str):
+        instance = self.acquire(name)
+        try:
+            yield instance
+        finally:
+            self.release(name)
+
+    def get(self, name: str):
+        """Loaded model without holding a reference. Never unloads anything, so a cold load
+        here is not checked against the budget; prefer acquire()/use()."""
+        entry = self._entry(name)
+        instance = self._load(entry)
+        entry.last_used = time.monotonic()
+        return instance
+
+    def proxy(self, name: str) -> "ModelProxy":
+        return ModelProxy(self, name)
+
+    # ----------- MEMORY BUDGET -----------
+
+    def _loaded_mb(self) -> int:
+        return sum(e.size_mb for e in self._entries.values() if e.instance is not None)
+
+    def _enforce_budget(self, incoming: _Entry):
+        """Unloads least recently used idle models (never incoming) until incoming fits."""
+        if not self.memory_budget_mb:
+            return
+        evicted = []
+        with self._lock:
+            needed = incoming.size_mb if incoming.instance is None else 0
+            while self._loaded_mb() + needed > self.memory_budget_mb:
+                idle = [e for e in self._entries.values() if e is not incoming and e.instance is not None and e.refs == 0]
+                if not idle:
+                    break
+                victim = min(idle, key=lambda e: e.last_used)
+                evicted.append((victim, victim.instance))
+                victim.instance = None
+        for entry, instance in evicted:
+            if entry.unloader:
+                entry.unloader(instance)
+        if evicted:
+            entry = instance = None
+            evicted.clear()
+            gc.collect()
+
+    def unload(self, name: str) -> bool:
+        entry = self._entry(name)
+        with self._lock:
+            if entry.instance is None or entry.refs:
+                return False
+            instance, entry.instance = entry.instance, None
+        if entry.unloader:
+            entry.unloader(instance)
+        del instance
+        gc.collect()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "memory_budget_mb": self.memory_budget_mb,
+                "loaded_mb": self._loaded_mb(),
+                "models": {
+                    e.name: {"loaded": e.instance is not None, "refs": e.refs, "size_mb": e.size_mb, "loads": e.loads}
+                    for e in self._entries.values()
+                },
+            }
+
+
+class ModelProxy:
+    """Stands in for a model at module level (nlp = registry.proxy(...)). Calls and
+    method calls load the model on demand and hold a reference while they run."""
+
+    def __init__(self, registry: ModelRegistry, name: str):
+        self._registry = registry
+        self._name = name
+
+    def __call__(self, *args, **kwargs):
+        with self._registry.use(self._name) as instance:
+            return instance(*args, **kwargs)
+
+    def pipe(self, *args, **kwargs):
+        # The reference is held for as long as the caller iterates
+        with self._registry.use(self._name) as instance:
+            yield from instance.pipe(*args, **kwargs)
+
+    def __getattr__(self, attr):
+        # Through use() so a cold load here still makes room under the budget
+        with self._registry.use(self._name) as instance:
+            value = getattr(instance, attr)
+        if not callable(value) or isinstance(value, type):
+            return value
+
+        registry, name = self._registry, self._name
+
+        def call(*args, **kwargs):
+            with registry.use(name) as instance:
+                return getattr(instance, attr)(*args, **kwargs)
+        return call
+
+    def __repr__(self):
+        return f"<ModelProxy {self._name}>"
+
+
+# ----------- DEFAULT MODELS -----------
+
+def spacy_loader(name: str, vectors_path: str = ""):
+    def load():
+        import spacy
+        try:
+            if vectors_path:
+                return load_pruned_vectors(spacy.load(name, exclude=["vectors"]), vectors_path)
+            return spacy.load(name)
+        except OSError:
+            print(f"FATAL: Please run 'python -m spacy download {name}' in terminal.")
+            raise
+    return load
+
+
+def spacy_lite_loader(name: str, vectors_path: str = ""):
+    """No dependency parser (the bulk of the CPU time); a rule-based sentencizer splits
+    sentences instead. Tagger, lemmatizer and NER stay."""
+    def load():
+        import spacy
+        try:
+            nlp = spacy.load(name, exclude=["parser"])
+        except OSError:
+            print(f"FATAL: Please run 'python -m spacy download {name}' in terminal.")
+            raise
+        nlp.add_pipe("sentencizer", first=True)
+        if vectors_path:
+            load_pruned_vectors(nlp, vectors_path)
+        if not nlp.vocab.vectors.size:
+            raise ValueError(
+                f"{name} has no word vectors, so lite relevance scores would not be comparable with the "
+                f"full profile; use a model with vectors (LITE_SPACY_MODEL) or set SPACY_VECTORS_PATH"
+            )
+        return nlp
+    return load
+
+
+def load_pruned_vectors(nlp, vectors_path: str):
+    """Replaces nlp's vector table with a build_pruned_vectors.py output. The table is
+    memory-mapped read-only; every original key stays mapped (pruned words point at their
+    nearest kept row), so has_vector / is_oov are unchanged."""
+    import json
+    import numpy as np
+    from spacy.vectors import Vectors
+    with open(os.path.join(vectors_path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    vectors = Vectors(
+        strings=nlp.vocab.strings,
+        data=np.load(os.path.join(vectors_path, "vectors.npy"), mmap_mode="r"),
+        name=meta["name"],
+    )
+    keys = np.load(os.path.join(vectors_path, "keys.npy"))
+    rows = np.load(os.path.join(vectors_path, "rows.npy"))
+    for key, row in zip(keys.tolist(), rows.tolist()):
+        vectors.add(key, row=row)
+    nlp.vocab.vectors = vectors
+    return nlp
+
+
+def sentence_transformer_loader(name: str):
+    def load():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(name)
+    return load
+
+
+def _load_languagetool():
+    import language_tool_python
+    # Comma separated LanguageTool servers (e.g. "http://lt1:8081,http://lt2:8081").
+    # Empty means a single local LanguageTool JVM started by language_tool_python.
+    servers = [u.strip() for u in os.environ.get("LANGUAGETOOL_SERVERS", "").split(",") if u.strip()]
+    if servers:
+        return [language_tool_python.LanguageTool("en-US", remote_server=url) for url in servers]
+    return [language_tool_python.LanguageTool("en-US")]
+
+
+def _close_languagetool(pool):
+    for tool in pool:
+        tool.close()
+
+
+registry = ModelRegistry()
+registry.register("en_core_web_sm", spacy_loader("en_core_web_sm"), size_mb=60)
+registry.register("en_core_web_lg", spacy_loader("en_core_web_lg", SPACY_VECTORS_PATH), size_mb=900)
+registry.register(LITE_PIPELINE, spacy_lite_loader(LITE_SPACY_MODEL, SPACY_VECTORS_PATH), size_mb=120)
+registry.register("all-mpnet-base-v2", sentence_transformer_loader("all-mpnet-base-v2"), size_mb=500)
+registry.register("languagetool", _load_languagetool, size_mb=700, unloader=_close_languagetool)
@@ -1,24 +1,66 @@
 import requests
-import spacy
 import json
+import codecs
+import itertools
+import os
+import hashlib
+import time
+from array import array
 from collections import Counter
 import re
 import numpy as np
 from bs4 import BeautifulSoup
-from fastapi import FastAPI, Body
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Body, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
 from pydantic import BaseModel, ConfigDict, Field
-from typing import List, Optional, Dict, Any, Union
+from typing import Iterable, List, Optional, Dict, Any, Union
 from enum import Enum
+from dataclasses import dataclass
 from sentence_transformers import SentenceTransformer, util
+from spacy.attrs import ORTH
+
+from admission import AdmissionMiddleware, admission
+from ann_index import similar_headings
+from boilerplate import BoilerplateDetector
+from content_extraction import EXTRACT_MAIN_CONTENT, extract_main_content
+from fast_json import FastJSONResponse, dumps
+from html_blocks import BlockStreamParser, resolve_limits
+from jobs import JobManager
+from sentence_columns import SentenceColumns
+from tracing import TracingMiddleware, span, timed_iter
+from model_registry import LITE_PIPELINE, registry
+from relevance import near_rounding_edge
 
 # --- 1. INITIALIZATION ---
-try:
-    nlp = spacy.load("en_core_web_lg")
-except:
-    print("FATAL: Please run 'python -m spacy download en_core_web_lg' in terminal.")
+# Models come from the shared registry: loaded on first use, one instance per process
+nlp = registry.proxy("en_core_web_lg")
 
-app = FastAPI(title="Centauri Pro NLP Service - Full Merged Version")
-model = SentenceTransformer('all-mpnet-base-v2')
+# Background analysis jobs (/jobs/...); workers start with the app and resume persisted jobs
+job_manager = JobManager()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    job_manager.start()
+    yield
+    job_manager.stop()
+
+
+app = FastAPI(title="Centauri Pro NLP Service - Full Merged Version", lifespan=lifespan)
+app.add_middleware(AdmissionMiddleware)
+app.add_middleware(TracingMiddleware)
+model = registry.proxy("all-mpnet-base-v2")
+
+# Sentences per nlp.pipe batch (and per relevance matrix) in /analyze and /process-article
+ARTICLE_PIPE_BATCH_SIZE = int(os.environ.get("ARTICLE_PIPE_BATCH_SIZE", "128"))
+# Blocks / sentences per nlp.pipe batch in answerOnly scans; small, so little is parsed past the answer
+ANSWER_SCAN_BATCH_SIZE = int(os.environ.get("ANSWER_SCAN_BATCH_SIZE", "8"))
+ANSWER_RELEVANCE_THRESHOLD = 0.60
+# /get-subtopics: 0.6 similarity is enough for a semantic match
+SUBTOPIC_SIMILARITY_THRESHOLD = 0.6
 
 URL_PATTERN = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\(\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
 
@@ -30,13 +72,42 @@ class Competitor(BaseModel):
 
 class CompetitorAnalysisRequest(BaseModel):
     data: List[Competitor]
+class AnalysisProfile(str, Enum):
+    FULL = "full"  # en_core_web_lg with the dependency parser (default)
+    LITE = "lite"  # LITE_SPACY_MODEL without the parser, rule-based sentences; for live previews
+
+PROFILE_PIPELINES = {AnalysisProfile.FULL: nlp, AnalysisProfile.LITE: registry.proxy(LITE_PIPELINE)}
+
 class ArticleRequest(BaseModel):
     htmlContent: str
     primaryKeyword: str
+    # Skip near-duplicate blocks (repeated CTAs, bios, disclaimers); they are listed in boilerplateBlocks
+    skipBoilerplate: bool = False
+    # With skipBoilerplate, also skip blocks already seen on other pages of this site; needs
+    # pageUrl (the page's URL or id, stable across edits) to tell the site's pages apart
+    siteId: Optional[str] = None
+    pageUrl: Optional[str] = None
+    # Drop page chrome (nav, sidebars, banners, related posts) and analyze only the main article body
+    extractMainContent: bool = EXTRACT_MAIN_CONTENT
+    # Per-request limits; capped by ARTICLE_MAX_BYTES / ARTICLE_MAX_BLOCKS / ARTICLE_MAX_SENTENCES
+    maxBytes: Optional[int] = None
+    maxBlocks: Optional[int] = None
+    maxSentences: Optional[int] = None
+    # Extra keywords scored in the same pass; see AnalysisResponse.relevanceMatrix
+    keywords: List[str] = []
+    profile: AnalysisProfile = AnalysisProfile.FULL
+    # Only answerPositionIndex (and answerPositionIndexByKeyword): sentences comes back empty and
+    # the scan stops at the first answer sentence
+    answerOnly: bool = False
+
+class SimilarityMode(str, Enum):
+    SPACY = "spacy"              # mean of spaCy word vectors (default, original behaviour)
+    TRANSFORMER = "transformer"  # sentence-transformer embeddings (the /get-subtopics model)
 
 class SimilarityRequest(BaseModel):
     text1: str
     text2: str
+    mode: SimilarityMode = SimilarityMode.SPACY
 
 class SimilarityResponse(BaseModel):
     similarity: float
@@ -47,6 +118,7 @@ class SimilarityItem(BaseModel):
 
 class SimilarityBatchRequest(BaseModel):
     items: List[SimilarityItem]
+    mode: SimilarityMode = SimilarityMode.SPACY
 
 class SimilarityBatchResponse(BaseModel):
     similarities: List[float]
@@ -72,6 +144,9 @@ class SentenceInput(BaseModel):
 class AnalysisRequest(BaseModel):
     sentences: List[SentenceInput]
     primaryKeyword: str
+    keywords: List[str] = []
+    profile: AnalysisProfile = AnalysisProfile.FULL
+    answerOnly: bool = False
 
 class EntityMentionFlag(BaseModel):
     value: int
@@ -99,9 +174,75 @@ class SentenceOutput(BaseModel):
     entityConfidenceFlag: int
     Source: str
 
+@dataclass(slots=True)
+class SentenceRecord:
+    """Internal per-sentence result. Same fields as SentenceOutput, built without Pydantic
+    validation and turned into the SentenceOutput JSON shape only by to_dict()."""
+    SentenceId: str
+    Sentence: str
+    HtmlTag: Optional[str]
+    ParagraphId: Optional[str]
+    FunctionalType: str
+    InformativeType: InformativeType
+    Structure: str
+    Voice: str
+    InfoQuality: str
+    ClaritySynthesisType: str
+    ClaimsCitation: bool
+    IsGrammaticallyCorrect: bool
+    HasPronoun: bool
+    RelevanceScore: float
+    answerSentenceFlag: int
+    entities: List[str]
+    entityConfidenceFlag: int
+    Source: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "SentenceId": self.SentenceId, "Sentence": self.Sentence,
+            "HtmlTag": self.HtmlTag, "ParagraphId": self.ParagraphId,
+            "FunctionalType": self.FunctionalType, "InformativeType": self.InformativeType.value,
+            "Structure": self.Structure, "Voice": self.Voice, "InfoQuality": self.InfoQuality,
+            "ClaritySynthesisType": self.ClaritySynthesisType, "ClaimsCitation": self.ClaimsCitation,
+            "IsGrammaticallyCorrect": self.IsGrammaticallyCorrect, "HasPronoun": self.HasPronoun,
+            "EntityCount": len(self.entities), "RelevanceScore": self.RelevanceScore,
+            "answerSentenceFlag": self.answerSentenceFlag,
+            "entityMentionFlag": {
+                "value": 1 if self.entities else 0, "entity_count": len(self.entities), "entities": self.entities
+            },
+            "entityConfidenceFlag": self.entityConfidenceFlag, "Source": self.Source,
+        }
+
+class BoilerplateBlock(BaseModel):
+    HtmlTag: str
+    Text: str
+    Scope: str  # "article" or "site"
+    MatchedParagraphId: Optional[str] = None
+    Similarity: float
+
+class ContentExtractionReport(BaseModel):
+    BlocksBefore: int
+    BlocksAfter: int
+    BlocksDropped: int
+    MainContainer: Optional[str] = None  # None when the whole page was kept
+    ExtractionMs: float
+    EstimatedTimeSavedMs: float = 0.0  # dropped blocks x this request's average per-block cost, minus extraction
+
 class AnalysisResponse(BaseModel):
     sentences: List[SentenceOutput]
     answerPositionIndex: Optional[str] = None
+    boilerplateBlocks: List[BoilerplateBlock] = []
+    contentExtraction: Optional[ContentExtractionReport] = None
+    # Set when a byte/block/sentence limit cut the article short; sentences holds the partial result
+    truncated: bool = False
+    truncationReason: Optional[str] = None
+    # Only with request.keywords: primaryKeyword first, then the extra keywords; one matrix row
+    # per sentence, one column per keyword; first answer sentence per keyword
+    keywords: Optional[List[str]] = None
+    relevanceMatrix: Optional[List[List[float]]] = None
+    answerPositionIndexByKeyword: Optional[Dict[str, Optional[str]]] = None
+    # Only with answerOnly: sentences analyzed before the scan stopped
+    sentencesScanned: Optional[int] = None
 
 class ScoreCard(BaseModel):
     model_config = ConfigDict(extra='ignore')
@@ -287,6 +428,25 @@ def compute_similarity(text1: str, text2: str) -> float:
         return 0.0
     return float(np.dot(v1, v2) / (norm1 * norm2))
 
+SIMILARITY_ENCODE_BATCH_SIZE = 64
+
+def compute_transformer_similarities(pairs: List[tuple]) -> List[float]:
+    """Cosine similarity of sentence-transformer embeddings for (text1, text2) pairs.
+    Every unique text is encoded once in a single batched call."""
+    if not pairs:
+        return []
+    unique_texts = list(dict.fromkeys(text for pair in pairs for text in pair))
+    index = {text: i for i, text in enumerate(unique_texts)}
+    with span("encoder"):
+        embeddings = model.encode(
+            unique_texts, batch_size=SIMILARITY_ENCODE_BATCH_SIZE,
+            normalize_embeddings=True, convert_to_numpy=True
+        )
+    left = embeddings[[index[a] for a, _ in pairs]]
+    right = embeddings[[index[b] for _, b in pairs]]
+    # Rows are unit length, so the row-wise dot product is the cosine
+    return np.einsum("ij,ij->i", left, right).astype(float).tolist()
+
 def is_block_element(tag):
     return tag.name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'li', 'td', 'th']
 
@@ -297,6 +457,60 @@ def is_self_contained(doc) -> bool:
     has_ref = any(ref in doc.text.lower() for ref in forward_refs)
     return not (starts_with_pronoun or has_ref)
 
+# Lite profile docs carry no dependency parse; these stand in for the dep_-based checks
+# using tags only, so every detector still returns one of its usual labels.
+FINITE_VERB_TAGS = {"VBD", "VBZ", "VBP", "MD"}
+SUBORDINATOR_TAGS = {"WDT", "WP", "WP$", "WRB"}
+
+
+def has_parse(doc) -> bool:
+    return doc.has_annotation("DEP")
+
+
+def sentence_subjects(doc) -> List[str]:
+    if has_parse(doc):
+        return [t.text.lower() for t in doc if "subj" in t.dep_]
+    # Nouns/pronouns ahead of the first verb
+    subjects = []
+    for t in doc:
+        if t.pos_ in ("VERB", "AUX"):
+            break
+        if t.pos_ in ("NOUN", "PROPN", "PRON", "NUM"):
+            subjects.append(t.text.lower())
+    return subjects
+
+
+def root_tokens(doc) -> list:
+    if has_parse(doc):
+        return [t for t in doc if t.dep_ == "ROOT"]
+    # First finite verb (else the first verb); an auxiliary hands over to the main verb it carries
+    verbs = [t for t in doc if t.pos_ in ("VERB", "AUX")]
+    finite = [t for t in verbs if t.tag_ in FINITE_VERB_TAGS]
+    if not verbs:
+        return []
+    root = (finite or verbs)[0]
+    for t in doc[root.i + 1:]:
+        if t.pos_ == "VERB":
+            return [t]
+        if t.pos_ not in ("AUX", "ADV", "PART"):
+            break
+    return [root]
+
+
+def is_passive(doc) -> bool:
+    if has_parse(doc):
+        return any(t.dep_ == "auxpass" for t in doc)
+    # A form of "be" followed (adverbs aside) by a past participle
+    for i, t in enumerate(doc):
+        if t.lemma_ == "be":
+            for nxt in doc[i + 1:i + 3]:
+                if nxt.tag_ == "VBN":
+                    return True
+                if nxt.pos_ != "ADV":
+                    break
+    return False
+
+
 def detect_structure_advanced(sent) -> str:
     """Ek single sentence ki structure nikalne ke liye logic"""
     # Verbs check
@@ -304,6 +518,16 @@ def detect_structure_advanced(sent) -> str:
     if not verbs: 
         return "Fragment"
 
+    if not has_parse(sent):
+        # Finite verbs ~ clauses; subordinating conjunctions / wh-words open the dependent ones
+        dc_count = sum(1 for t in sent if t.pos_ == "SCONJ" or (t.i > sent[0].i and t.tag_ in SUBORDINATOR_TAGS))
+        ic_count = max(sum(1 for t in verbs if t.tag_ in FINITE_VERB_TAGS) - dc_count, 1)
+        if ic_count >= 2 and dc_count >= 1:
+            return "CompoundComplex"
+        if dc_count >= 1:
+            return "Complex"
+        return "Compound" if ic_count >= 2 else "Simple"
+
     # Independent Clauses (IC): ROOT aur uske parallel main verbs
     ic_count = sum(1 for t in sent if t.dep_ == "ROOT" or (t.dep_ == "conj" and t.pos_ in ("VERB", "AUX")))
     
@@ -372,7 +596,8 @@ def classify_informative_type_merged(doc) -> InformativeType:
     # 2. SUGGESTION (The Expertise Powerhouse)
     # Catch Imperatives (sentences starting with a base verb like "Learn", "Choose", "Build")
     # And Modals (should, must, need to)
-    is_imperative = doc[0].pos_ == "VERB" and doc[0].dep_ == "ROOT"
+    roots = root_tokens(doc)
+    is_imperative = doc[0].pos_ == "VERB" and doc[0] in roots
     has_modal = any(t.lemma_ in {"should", "must", "ought", "need", "require"} for t in doc)
     
     if is_imperative or has_modal:
@@ -380,7 +605,7 @@ def classify_informative_type_merged(doc) -> InformativeType:
 
     # 3. DEFINITION (The Authority Check)
     # Check for "X is a Y" where X is a Subject and Y is a Complement
-    has_copula = any(t.lemma_ == "be" and t.dep_ == "ROOT" for t in doc)
+    has_copula = any(t.lemma_ == "be" for t in roots)
     if has_copula:
         # If the root is 'be' and it connects a subject to a noun/adj, it's a definition or observation
         return InformativeType.DEFINITION
@@ -490,13 +715,13 @@ def identify_source_type_semantic(doc, text: str) -> str:
     text_lower = text.lower().strip()
     
     # --- 0. PRE-REQUISITES ---
-    subjects = [t.text.lower() for t in doc if "subj" in t.dep_]
+    subjects = sentence_subjects(doc)
     # Check for specific entities (IRS, ACH, GPE, etc.)
     has_external_entity = any(ent.label_ in {"ORG", "GPE", "LAW", "MONEY", "CARDINAL"} for ent in doc.ents)
     has_brand = "inkle" in text_lower # Specific brand recognition
     
     # Action/Verb analysis
-    root_verb = [t.lemma_ for t in doc if t.dep_ == "ROOT"]
+    root_verb = [t.lemma_ for t in root_tokens(doc)]
     root_verb = root_verb[0] if root_verb else ""
 
     # --- 1. FIRST PARTY (Publisher's Expertise/Action) ---
@@ -545,8 +770,41 @@ def identify_source_type_semantic(doc, text: str) -> str:
     return "Unknown"
     
     
-def analyze_logic(text: str, s_id: str, keyword_doc, state: Dict, h_tag: str = None, p_id: str = None) -> SentenceOutput:
-    doc = nlp(text)
+def keyword_context(doc, keyword_doc, state: Dict) -> bool:
+    """is_keyword_active state machine: is the sentence about the keyword by context
+    (pronoun continuing a keyword sentence, or the keyword as subject)? Updates state."""
+    # State Tracking
+    subjects = sentence_subjects(doc)
+    starts_with_pronoun = any(t.lower_ in {"it", "this", "that", "these"} for t in doc[:2])
+    is_relevant_by_context = False
+    if starts_with_pronoun and state["is_keyword_active"]:
+        is_relevant_by_context = True
+    elif any(k in " ".join(subjects) for k in keyword_doc.text.split()):
+        state["is_keyword_active"] = True
+        is_relevant_by_context = True
+    else:
+        if subjects: state["is_keyword_active"] = False
+    return is_relevant_by_context
+
+
+def answer_eligible(doc, info_type: InformativeType) -> bool:
+    """Keyword-independent half of the answer-sentence test."""
+    return (
+        info_type not in [InformativeType.FILLER, InformativeType.QUESTION]
+        and any(t.pos_ in {"VERB", "AUX"} for t in doc)
+        and is_self_contained(doc)
+    )
+
+
+def analyze_logic(text: str, s_id: str, keyword_doc, state: Dict, h_tag: str = None, p_id: str = None,
+                  doc=None, relevance: Optional[float] = None, above_threshold: Optional[bool] = None,
+                  pipeline=None) -> SentenceRecord:
+    # doc: the sentence already parsed by a batched nlp.pipe
+    # relevance / above_threshold: precomputed by keyword_relevance() for the whole batch
+    # pipeline: the profile's spaCy pipeline (default: the full one)
+    pipeline = nlp if pipeline is None else pipeline
+    if doc is None:
+        doc = pipeline(text)
     info_type = classify_informative_type_merged(doc)
     # Target types for source attribution
     source_trigger_types = {
@@ -560,44 +818,163 @@ def analyze_logic(text: str, s_id: str, keyword_doc, state: Dict, h_tag: str = N
     if info_type in source_trigger_types:
         # Using Semantic brain instead of just hardcoded strings
         source_value = identify_source_type_semantic(doc, text)
-    voice = "Passive" if any(t.dep_ == "auxpass" for t in doc) else "Active"
+    voice = "Passive" if is_passive(doc) else "Active"
     struct = detect_structure_advanced(doc)
-    relevance = doc.similarity(keyword_doc) if doc.vector_norm and keyword_doc.vector_norm else 0.0
+    if relevance is None:
+        relevance = doc.similarity(keyword_doc) if doc.vector_norm and keyword_doc.vector_norm else 0.0
+    if above_threshold is None:
+        above_threshold = relevance > ANSWER_RELEVANCE_THRESHOLD
 
-    # State Tracking
-    subjects = [t.text.lower() for t in doc if "subj" in t.dep_]
-    starts_with_pronoun = any(t.lower_ in {"it", "this", "that", "these"} for t in doc[:2])
-    is_relevant_by_context = False
-    if starts_with_pronoun and state["is_keyword_active"]:
-        is_relevant_by_context = True
-    elif any(k in " ".join(subjects) for k in keyword_doc.text.split()):
-        state["is_keyword_active"] = True
-        is_relevant_by_context = True
-    else:
-        if subjects: state["is_keyword_active"] = False
-
-    is_answer = 0
-    if info_type not in [InformativeType.FILLER, InformativeType.QUESTION] and any(t.pos_ in {"VERB", "AUX"} for t in doc):
-        if (relevance > 0.60 or is_relevant_by_context) and is_self_contained(doc):
-            is_answer = 1
+    is_relevant_by_context = keyword_context(doc, keyword_doc, state)
+    is_answer = 1 if answer_eligible(doc, info_type) and (above_threshold or is_relevant_by_context) else 0
 
     ent_data = [ent.text for ent in doc.ents if ent.label_ in {"ORG", "PRODUCT", "LAW", "NORP", "FAC", "PERCENT", "MONEY", "GPE"}]
     unique_ents = list(set(ent_data))
 
-    return SentenceOutput(
+    return SentenceRecord(
         SentenceId=s_id, Sentence=text, HtmlTag=h_tag, ParagraphId=p_id,
         FunctionalType="Interrogative" if info_type == InformativeType.QUESTION else "Declarative",
         InformativeType=info_type, Structure=struct, Voice=voice,
         InfoQuality=detect_info_quality_merged(doc, text),
         ClaritySynthesisType=detect_clarity_synthesis(doc, voice, struct, info_type),
         ClaimsCitation=bool(URL_PATTERN.search(text)), IsGrammaticallyCorrect=check_grammar_heuristics(doc, text),
-        HasPronoun=not is_self_contained(doc), EntityCount=len(unique_ents), RelevanceScore=round(relevance, 4),
+        HasPronoun=not is_self_contained(doc), RelevanceScore=round(relevance, 4),
         answerSentenceFlag=is_answer,
-        entityMentionFlag=EntityMentionFlag(value=1 if unique_ents else 0, entity_count=len(unique_ents), entities=unique_ents),
+        entities=unique_ents,
         entityConfidenceFlag=1 if (unique_ents and not any(h in text.lower() for h in ["might", "could", "maybe"])) else 0,
         Source=source_value
     )
 
+def sentence_vectors(docs) -> np.ndarray:
+    """Doc.vector (mean of the token vectors) for every doc with one table gather, adding
+    token k of every doc at once in the same float32 order Doc.vector sums them."""
+    vectors = docs[0].vocab.vectors
+    if vectors.mode != "default" or not vectors.size or getattr(vectors, "attr", ORTH) != ORTH \
+            or any(len(doc) == 0 or doc.user_hooks for doc in docs):
+        return np.stack([doc.vector for doc in docs])
+    lengths = np.fromiter((len(doc) for doc in docs), dtype=np.int64, count=len(docs))
+    keys = np.fromiter((t.orth for doc in docs for t in doc), dtype=np.uint64, count=int(lengths.sum()))
+    rows = vectors.find(keys=keys)
+    # Last row is all zeros: out-of-vocabulary tokens and padding past a doc's end
+    table = np.asarray(vectors.data)
+    token_vectors = np.vstack([table[rows], np.zeros((1, table.shape[1]), dtype=table.dtype)])
+    token_vectors[:-1][rows < 0] = 0
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    padding = len(token_vectors) - 1
+    sums = np.zeros((len(docs), table.shape[1]), dtype=table.dtype)
+    for k in range(int(lengths.max())):
+        sums += token_vectors[np.where(k < lengths, starts + k, padding)]
+    return sums / lengths[:, None].astype(np.float32)
+
+
+def keyword_relevance(docs, keyword_docs) -> np.ndarray:
+    """doc.similarity(keyword_doc) for a batch of sentence docs against every keyword, as
+    analyze_logic computes it (0.0 when either vector is zero): sentence vectors and norms
+    are built once, then one matrix product gives the (sentences x keywords) scores."""
+    scores = np.zeros((len(docs), len(keyword_docs)))
+    keyword_norms = np.array([k.vector_norm for k in keyword_docs], dtype=np.float64)
+    if not docs or not keyword_norms.any():
+        return scores
+    vectors = sentence_vectors(docs)
+    # Doc.vector_norm squares in float32 and sums in float64
+    norms = np.sqrt(np.square(vectors).astype(np.float64).sum(axis=1))
+    nonzero = norms > 0
+    keyword_matrix = np.stack([k.vector for k in keyword_docs], axis=1)
+    active = keyword_norms > 0
+    scores[np.ix_(nonzero, active)] = (vectors[nonzero] @ keyword_matrix[:, active]) / np.outer(norms[nonzero], keyword_norms[active])
+
+    # Scores right at a 4-decimal rounding edge or at the answer threshold are recomputed
+    # with Doc.similarity itself (a handful per thousand)
+    near_edge = near_rounding_edge(scores, ANSWER_RELEVANCE_THRESHOLD)
+    for i, j in zip(*np.nonzero(near_edge & np.outer(nonzero, active))):
+        scores[i, j] = docs[i].similarity(keyword_docs[j])
+    # Doc.similarity short-cuts identical token sequences to exactly 1.0
+    keyword_columns: Dict[tuple, List[int]] = {}
+    for j, keyword_doc in enumerate(keyword_docs):
+        if active[j]:
+            keyword_columns.setdefault(tuple(t.orth for t in keyword_doc), []).append(j)
+    lengths = {len(orths) for orths in keyword_columns}
+    for i, doc in enumerate(docs):
+        if nonzero[i] and len(doc) in lengths:
+            for j in keyword_columns.get(tuple(t.orth for t in doc), ()):
+                scores[i, j] = 1.0
+    return scores
+
+
+def _batches(iterable, size: int):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def analyze_sentences(items, keyword_docs, batch_size: int = ARTICLE_PIPE_BATCH_SIZE, pipeline=None):
+    """items: (text, sentence id, html tag, paragraph id) in document order; keyword_docs[0]
+    is the primary keyword. Each sentence is parsed once (nlp.pipe) and each batch's
+    relevance against all keywords is one matrix. Yields (SentenceRecord, relevance per
+    keyword, answer flag per keyword); the record itself describes the primary keyword.
+    Every keyword runs its own is_keyword_active state machine."""
+    pipeline = nlp if pipeline is None else pipeline
+    items = list(items)
+    states = [{"is_keyword_active": True} for _ in keyword_docs]
+    docs = timed_iter("spacy", pipeline.pipe((text for text, _, _, _ in items), batch_size=batch_size))
+    for batch in _batches(zip(items, docs), batch_size):
+        with span("relevance"):
+            relevance = keyword_relevance([doc for _, doc in batch], keyword_docs)
+            above_threshold = relevance > ANSWER_RELEVANCE_THRESHOLD
+        for ((text, s_id, h_tag, p_id), doc), scores, above in zip(batch, relevance.tolist(), above_threshold.tolist()):
+            with span("detectors"):
+                record = analyze_logic(text, s_id, keyword_docs[0], states[0], h_tag, p_id,
+                                       doc=doc, relevance=scores[0], above_threshold=above[0], pipeline=pipeline)
+                answers = [record.answerSentenceFlag]
+                if len(keyword_docs) > 1:
+                    eligible = answer_eligible(doc, record.InformativeType)
+                    for keyword_doc, state, is_above in zip(keyword_docs[1:], states[1:], above[1:]):
+                        in_context = keyword_context(doc, keyword_doc, state)
+                        answers.append(1 if eligible and (is_above or in_context) else 0)
+            yield record, scores, answers
+
+
+def scan_answers(items, keyword_docs, batch_size: int = ANSWER_SCAN_BATCH_SIZE, pipeline=None):
+    """answerOnly pass over items: (text, sentence id) in document order. Computes only what
+    the answer flag depends on (keyword context, relevance, info type, self-containedness),
+    each only when the flag still depends on it, and stops once every keyword has its first
+    answer sentence. Returns (first answer id per keyword, sentences scanned)."""
+    pipeline = nlp if pipeline is None else pipeline
+    states = [{"is_keyword_active": True} for _ in keyword_docs]
+    first_ids: List[Optional[str]] = [None] * len(keyword_docs)
+    scanned = 0
+    for doc, s_id in timed_iter("spacy", pipeline.pipe(items, as_tuples=True, batch_size=batch_size)):
+        scanned += 1
+        with span("detectors"):
+            eligible = None
+            for k, (keyword_doc, state) in enumerate(zip(keyword_docs, states)):
+                if first_ids[k] is not None:
+                    continue
+                # Runs on every sentence: it carries is_keyword_active forward
+                in_context = keyword_context(doc, keyword_doc, state)
+                if not in_context:
+                    relevance = doc.similarity(keyword_doc) if doc.vector_norm and keyword_doc.vector_norm else 0.0
+                    if relevance <= ANSWER_RELEVANCE_THRESHOLD:
+                        continue
+                if eligible is None:
+                    eligible = answer_eligible(doc, classify_informative_type_merged(doc))
+                if eligible:
+                    first_ids[k] = s_id
+        if None not in first_ids:
+            break
+    return first_ids, scanned
+
+
+def keyword_list(primary_keyword: str, keywords: List[str]) -> List[str]:
+    """Primary keyword first, then the extra keywords without blanks or (case-insensitive) repeats."""
+    ordered, seen = [primary_keyword], {primary_keyword.lower()}
+    for keyword in keywords:
+        if keyword.strip() and keyword.lower() not in seen:
+            seen.add(keyword.lower())
+            ordered.append(keyword)
+    return ordered
+
+
 @app.post("/get-subtopics")
 async def get_subtopics(request: CompetitorAnalysisRequest):
     all_comps = request.data
@@ -612,32 +989,25 @@ async def get_subtopics(request: CompetitorAnalysisRequest):
 
     # 1. Embeddings generate karo
     texts = [h["text"] for h in all_headings]
-    embeddings = model.encode(texts, convert_to_tensor=True)
+    with span("encoder"):
+        embeddings = model.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+    # For every heading, the later headings above 0.6 similarity (exact, or LSH for large sets)
+    with span("neighbors"):
+        neighbors = similar_headings(embeddings, SUBTOPIC_SIMILARITY_THRESHOLD)
+    return group_subtopics(texts, [h["comp_idx"] for h in all_headings], neighbors)
+
 
+def group_subtopics(texts: List[str], comp_idx: List[int], neighbors) -> List[str]:
     final_output = []
     already_grouped = set()
 
     # 2. Semantic Logic
-    for i in range(len(all_headings)):
+    for i in range(len(texts)):
         if i in already_grouped: continue
-        
-        # Is group mein kaunse URLs (competitors) hain
-        current_group_indices = [i]
-        matched_comp_indices = {all_headings[i]["comp_idx"]}
 
-        for j in range(i + 1, len(all_headings)):
-            if j in already_grouped: continue
-            
-            # Cosine similarity calculate karo
-            score = util.cos_sim(embeddings[i], embeddings[j]).item()
-            
-            # DEBUG: Console pe check karo kya match ho raha hai
-            # print(f"Comparing: [{texts[i]}] vs [{texts[j]}] | Score: {score:.4f}")
-
-            # 0.6 Similarity (Semantic match ke liye kaafi hai)
-            if score > 0.6:
-                matched_comp_indices.add(all_headings[j]["comp_idx"])
-                current_group_indices.append(j)
+        # Is group mein kaunse URLs (competitors) hain
+        current_group_indices = [i] + [j for j in neighbors[i].tolist() if j not in already_grouped]
+        matched_comp_indices = {comp_idx[idx] for idx in current_group_indices}
 
         # 3. CONSENSUS: 3 ya usse zyada competitors
         if len(matched_comp_indices) >= 3:
@@ -652,21 +1022,97 @@ async def get_subtopics(request: CompetitorAnalysisRequest):
     
 @app.post("/similarity", response_model=SimilarityResponse)
 def similarity(req: SimilarityRequest):
+    if req.mode == SimilarityMode.TRANSFORMER:
+        return SimilarityResponse(similarity=compute_transformer_similarities([(req.text1, req.text2)])[0])
     return SimilarityResponse(similarity=compute_similarity(req.text1, req.text2))
 
 @app.post("/similarity/batch", response_model=SimilarityBatchResponse)
 def similarity_batch(req: SimilarityBatchRequest):
+    if req.mode == SimilarityMode.TRANSFORMER:
+        scores = compute_transformer_similarities([(i.text1, i.text2) for i in req.items])
+        return SimilarityBatchResponse(similarities=[round(s, 4) for s in scores])
     return SimilarityBatchResponse(similarities=[round(compute_similarity(i.text1, i.text2), 4) for i in req.items])
 
+def analysis_payload(columns: SentenceColumns, first_id: Optional[str],
+                     boilerplate_blocks: List[BoilerplateBlock] = (),
+                     content_extraction: Optional[ContentExtractionReport] = None,
+                     truncation_reason: Optional[str] = None,
+                     keyword_matrix: Optional[Dict[str, Any]] = None,
+                     sentences_scanned: Optional[int] = None) -> Dict[str, Any]:
+    # AnalysisResponse shape; the columnar buffer is materialized only here
+    keyword_matrix = keyword_matrix or {}
+    with span("serialize"):
+        sentences = columns.to_dicts()
+    return {
+        "sentences": sentences,
+        "answerPositionIndex": first_id,
+        "boilerplateBlocks": [b.model_dump() for b in boilerplate_blocks],
+        "contentExtraction": content_extraction.model_dump() if content_extraction else None,
+        "truncated": truncation_reason is not None,
+        "truncationReason": truncation_reason,
+        "keywords": keyword_matrix.get("keywords"),
+        "relevanceMatrix": keyword_matrix.get("relevanceMatrix"),
+        "answerPositionIndexByKeyword": keyword_matrix.get("answerPositionIndexByKeyword"),
+        "sentencesScanned": sentences_scanned,
+    }
+
+def analysis_response(columns: SentenceColumns, first_id: Optional[str], **extra) -> FastJSONResponse:
+    return FastJSONResponse(analysis_payload(columns, first_id, **extra))
+
+def collect_sentences(items, primary_keyword: str, keywords: List[str], total: int = 0, progress=None,
+                      pipeline=None):
+    """Runs analyze_sentences into a SentenceColumns buffer. Returns (columns, first answer id,
+    keyword_matrix); keyword_matrix is None unless extra keywords were asked for."""
+    pipeline = nlp if pipeline is None else pipeline
+    all_keywords = keyword_list(primary_keyword, keywords)
+    keyword_docs = list(pipeline.pipe(k.lower() for k in all_keywords))
+    results = SentenceColumns()
+    first_ids: List[Optional[str]] = [None] * len(all_keywords)
+    matrix = array("d")
+    for res, scores, answers in analyze_sentences(items, keyword_docs, pipeline=pipeline):
+        for k, answer in enumerate(answers):
+            if answer == 1 and first_ids[k] is None:
+                first_ids[k] = res.SentenceId
+        results.append(res)
+        matrix.extend(scores)
+        if progress is not None:
+            progress(len(results), total)
+
+    keyword_matrix = None
+    if keywords:
+        width = len(all_keywords)
+        keyword_matrix = {
+            "keywords": all_keywords,
+            "relevanceMatrix": [[round(x, 4) for x in matrix[i:i + width]] for i in range(0, len(matrix), width)],
+            "answerPositionIndexByKeyword": dict(zip(all_keywords, first_ids)),
+        }
+    return results, first_ids[0], keyword_matrix
+
+def find_answers(items, primary_keyword: str, keywords: List[str], pipeline=None):
+    """answerOnly counterpart of collect_sentences: items are (text, sentence id). Returns
+    (first answer id per keyword, keyword_matrix without relevanceMatrix, sentences scanned)."""
+    pipeline = nlp if pipeline is None else pipeline
+    all_keywords = keyword_list(primary_keyword, keywords)
+    keyword_docs = list(pipeline.pipe(k.lower() for k in all_keywords))
+    first_ids, scanned = scan_answers(items, keyword_docs, pipeline=pipeline)
+    keyword_matrix = None
+    if keywords:
+        keyword_matrix = {"keywords": all_keywords, "answerPositionIndexByKeyword": dict(zip(all_keywords, first_ids))}
+    return first_ids, keyword_matrix, scanned
+
 @app.post("/analyze", response_model=AnalysisResponse)
 def analyze(request: AnalysisRequest):
-    results, first_id = [], None
-    kw_doc, state = nlp(request.primaryKeyword.lower()), {"is_keyword_active": True}
-    for s in request.sentences:
-        res = analyze_logic(s.Text, s.Id, kw_doc, state)
-        if res.answerSentenceFlag == 1 and first_id is None: first_id = res.SentenceId
-        results.append(res)
-    return AnalysisResponse(sentences=results, answerPositionIndex=first_id)
+    pipeline = PROFILE_PIPELINES[request.profile]
+    if request.answerOnly:
+        first_ids, keyword_matrix, scanned = find_answers(
+            ((s.Text, s.Id) for s in request.sentences), request.primaryKeyword, request.keywords, pipeline
+        )
+        return analysis_response(SentenceColumns(), first_ids[0], keyword_matrix=keyword_matrix, sentences_scanned=scanned)
+    items = ((s.Text, s.Id, None, None) for s in request.sentences)
+    results, first_id, keyword_matrix = collect_sentences(
+        items, request.primaryKeyword, request.keywords, pipeline=pipeline
+    )
+    return analysis_response(results, first_id, keyword_matrix=keyword_matrix)
 
 
 class RecommendationGenerator:
@@ -1636,16 +2082,118 @@ def extract_seo_label_generic(text: str):
     
     
     
-@app.post("/process-article", response_model=AnalysisResponse)
-def process_article(request: ArticleRequest):
-    soup = BeautifulSoup(request.htmlContent, "html.parser")
-    results, first_id, s_count, p_count = [], None, 1, 1
-    
-    kw_doc = nlp(request.primaryKeyword.lower())
-    state = {"is_keyword_active": True}
-    processed_texts = set()
+def clean_block_text(tag_name: str, raw_text: str) -> str:
+    # --- NEW CLEANING LOGIC START ---
+    # Agar block header hai, toh sentence splitting se PEHLE label udao
+    if tag_name in ["h1", "h2", "h3", "h4", "h5", "h6"]:
+        # extract_seo_label_generic sirf label return karega aur bacha hua mal-paani
+        _, cleaned_text = extract_seo_label_generic(raw_text)
+
+        # Agar cleaning ke baad kuch bacha, toh usey hi use karo
+        # Varna agar sirf label hi tha header mein, toh raw_text ko empty kar do skip karne ke liye
+        raw_text = cleaned_text if cleaned_text.strip() else ""
+    # --- NEW CLEANING LOGIC END ---
+    return raw_text
+
+
+def sentence_docs(doc):
+    """(stripped text, Doc) for every non-empty sentence of a parsed block; the Doc is the
+    sentence span without its outer whitespace tokens, copied out of the block's parse."""
+    for sent in doc.sents:
+        start, end = sent.start, sent.end
+        while start < end and doc[start].is_space:
+            start += 1
+        while end > start and doc[end - 1].is_space:
+            end -= 1
+        if start < end:
+            yield sent.text.strip(), doc[start:end].as_doc()
+
+
+def analyze_block(raw_text: str, h_tag: str, p_id: str, kw_doc, state: Dict, s_count: int,
+                  max_sentences: int, pipeline=None) -> tuple:
+    """Sentences of one block, numbered from s_count. Returns (results, hit_sentence_limit).
+    The block is parsed once; each sentence is analyzed on its span of that parse."""
+    pipeline = nlp if pipeline is None else pipeline
+    # spaCy refuses texts over nlp.max_length
+    with span("spacy"):
+        doc = pipeline(raw_text[:pipeline.max_length])
+
+    results = []
+    for sentence_text, sentence_doc in sentence_docs(doc):
+        if len(results) >= max_sentences:
+            return results, True
+        with span("detectors"):
+            res = analyze_logic(
+                text=sentence_text,
+                s_id=f"S{s_count + len(results)}",
+                keyword_doc=kw_doc,
+                state=state,
+                h_tag=h_tag,
+                p_id=p_id,
+                doc=sentence_doc,
+                pipeline=pipeline
+            )
 
-    for block in soup.find_all(is_block_element):
+        # Agar analyze_logic None return kare (additional safety), toh skip
+        if res is None:
+            continue
+        results.append(res)
+    return results, False
+
+
+@dataclass(slots=True)
+class ArticlePlan:
+    # (sentence text, html tag, paragraph id) in document order; a lazy, unlimited iterator
+    # when planned with split=False
+    sentences: Iterable[tuple]
+    boilerplate_blocks: List[BoilerplateBlock]
+    extraction: Optional[Dict[str, Any]]
+    truncation_reason: Optional[str]
+    blocks: int
+    started: float  # perf_counter() when sentence splitting began, for the extraction estimate
+    max_sentences: int
+
+
+def block_sentences(block_texts: List[tuple], pipeline, batch_size: Optional[int] = None):
+    """(sentence text, html tag, paragraph id) for (html tag, text, paragraph id) blocks,
+    split as they are consumed."""
+    # spaCy refuses texts over nlp.max_length
+    docs = pipeline.pipe((text[:pipeline.max_length] for _, text, _ in block_texts), batch_size=batch_size)
+    for (tag, _, p_id), doc in zip(block_texts, docs):
+        for sent in doc.sents:
+            sentence_text = sent.text.strip()
+            if sentence_text:
+                yield sentence_text, tag, p_id
+
+
+def plan_article(request: ArticleRequest, split: bool = True) -> ArticlePlan:
+    """Pass 1: HTML -> blocks -> sentences, with every limit applied. The sentence total is
+    known before any analysis runs (job progress reports done/total from it). With
+    split=False blocks are split into sentences only as plan.sentences is consumed, and
+    maxSentences is left to the consumer."""
+    max_bytes, max_blocks, max_sentences = resolve_limits(request.maxBytes, request.maxBlocks, request.maxSentences)
+    truncation_reason = None
+    html = request.htmlContent
+    if len(html.encode("utf-8")) > max_bytes:
+        html = html.encode("utf-8")[:max_bytes].decode("utf-8", errors="ignore")
+        truncation_reason = "maxBytes"
+
+    with span("html"):
+        soup = BeautifulSoup(html, "html.parser")
+    processed_texts = set()
+    boilerplate_blocks = []
+    boilerplate = None
+    if request.skipBoilerplate:
+        boilerplate = BoilerplateDetector(site_id=request.siteId, page_key=request.pageUrl)
+
+    roots, extraction = [soup], None
+    if request.extractMainContent:
+        with span("extraction"):
+            roots, extraction = extract_main_content(soup)
+    blocks = [b for root in roots for b in ([root] if is_block_element(root) else root.find_all(is_block_element))]
+
+    block_texts = []  # (html tag, cleaned text, paragraph id)
+    for block in blocks:
         if any(is_block_element(p) for p in block.parents): 
             continue
             
@@ -1657,48 +2205,256 @@ def process_article(request: ArticleRequest):
         if block.name == 'tr':
             raw_text = " - ".join([td.get_text(strip=True) for td in block.find_all('td') if td.get_text(strip=True)])
 
-        # --- NEW CLEANING LOGIC START ---
-        # Agar block header hai, toh sentence splitting se PEHLE label udao
-        if block.name in ["h1", "h2", "h3", "h4", "h5", "h6"]:
-            # extract_seo_label_generic sirf label return karega aur bacha hua mal-paani
-            _, cleaned_text = extract_seo_label_generic(raw_text)
-            
-            # Agar cleaning ke baad kuch bacha, toh usey hi use karo
-            # Varna agar sirf label hi tha header mein, toh raw_text ko empty kar do skip karne ke liye
-            raw_text = cleaned_text if cleaned_text.strip() else ""
-        # --- NEW CLEANING LOGIC END ---
-
+        raw_text = clean_block_text(block.name, raw_text)
         if not raw_text: # Skip if the header became empty after cleaning
             continue
 
-        # 2. Logical Sentence Splitting (Ab cleaned text pe split hoga)
-        doc = nlp(raw_text)
-        sentences = [sent.text.strip() for sent in doc.sents if sent.text.strip()]
-
-        for sentence_text in sentences:
-            res = analyze_logic(
-                text=sentence_text, 
-                s_id=f"S{s_count}", 
-                keyword_doc=kw_doc, 
-                state=state, 
-                h_tag=block.name, 
-                p_id=f"P{p_count}"
-            )
-
-            # Agar analyze_logic None return kare (additional safety), toh skip
-            if res is None:
+        p_id = f"P{len(block_texts) + 1}"
+        # Near-duplicate boilerplate never reaches the spaCy pipeline
+        if boilerplate is not None:
+            with span("boilerplate"):
+                match = boilerplate.check(raw_text, p_id)
+            if match:
+                boilerplate_blocks.append(BoilerplateBlock.model_construct(
+                    HtmlTag=block.name, Text=raw_text, Scope=match["scope"],
+                    MatchedParagraphId=match["matchedBlockId"], Similarity=match["similarity"]
+                ))
+                processed_texts.add(raw_text)
                 continue
 
-            if res.answerSentenceFlag == 1 and first_id is None: 
-                first_id = res.SentenceId
-                
-            results.append(res)
-            s_count += 1 
-        
+        if len(block_texts) >= max_blocks:
+            truncation_reason = "maxBlocks"
+            break
+        block_texts.append((block.name, raw_text, p_id))
         processed_texts.add(raw_text)
-        p_count += 1
+    if boilerplate is not None:
+        with span("boilerplate"):
+            boilerplate.flush()
+
+    # 2. Logical Sentence Splitting (Ab cleaned text pe split hoga)
+    started = time.perf_counter()
+    pipeline = PROFILE_PIPELINES[request.profile]
+    if not split:
+        sentences = block_sentences(block_texts, pipeline, batch_size=ANSWER_SCAN_BATCH_SIZE)
+        return ArticlePlan(sentences, boilerplate_blocks, extraction, truncation_reason, len(block_texts), started, max_sentences)
+
+    sentences = list(itertools.islice(timed_iter("spacy", block_sentences(block_texts, pipeline)), max_sentences + 1))
+    if len(sentences) > max_sentences:
+        sentences.pop()
+        truncation_reason = "maxSentences"
+
+    return ArticlePlan(sentences, boilerplate_blocks, extraction, truncation_reason, len(block_texts), started, max_sentences)
+
+
+def run_article(request: ArticleRequest, plan: ArticlePlan, progress=None) -> Dict[str, Any]:
+    """Pass 2: sentence analysis in document order (the keyword context state depends on it).
+    progress(done, total) is called as sentences complete."""
+    items = ((text, f"S{i + 1}", tag, p_id) for i, (text, tag, p_id) in enumerate(plan.sentences))
+    results, first_id, keyword_matrix = collect_sentences(
+        items, request.primaryKeyword, request.keywords, len(plan.sentences), progress,
+        pipeline=PROFILE_PIPELINES[request.profile]
+    )
+
+    report = None
+    if plan.extraction is not None:
+        report = ContentExtractionReport.model_construct(**plan.extraction)
+        if plan.blocks:
+            per_block_ms = (time.perf_counter() - plan.started) * 1000 / plan.blocks
+            report.EstimatedTimeSavedMs = round(per_block_ms * report.BlocksDropped - report.ExtractionMs, 2)
+
+    return analysis_payload(results, first_id, plan.boilerplate_blocks, report, plan.truncation_reason, keyword_matrix)
+
+
+def answer_position_payload(request: ArticleRequest) -> Dict[str, Any]:
+    """answerOnly /process-article: blocks are split and scanned a few at a time and the scan
+    stops at the first answer sentence. Sentence ids are the ones the full analysis gives."""
+    plan = plan_article(request, split=False)
+    sentences = itertools.islice(plan.sentences, plan.max_sentences)
+    items = ((text, f"S{i + 1}") for i, (text, _, _) in enumerate(sentences))
+    first_ids, keyword_matrix, scanned = find_answers(
+        items, request.primaryKeyword, request.keywords, PROFILE_PIPELINES[request.profile]
+    )
+    truncation_reason = plan.truncation_reason
+    if None in first_ids and scanned == plan.max_sentences and next(plan.sentences, None) is not None:
+        truncation_reason = "maxSentences"
+    report = ContentExtractionReport.model_construct(**plan.extraction) if plan.extraction is not None else None
+    return analysis_payload(SentenceColumns(), first_ids[0], plan.boilerplate_blocks, report, truncation_reason,
+                            keyword_matrix, scanned)
+
+
+def process_article_payload(request: ArticleRequest, progress=None) -> Dict[str, Any]:
+    if request.answerOnly:
+        return answer_position_payload(request)
+    return run_article(request, plan_article(request), progress)
+
+
+@app.post("/process-article", response_model=AnalysisResponse)
+def process_article(request: ArticleRequest):
+    return FastJSONResponse(process_article_payload(request))
 
-    return AnalysisResponse(sentences=results, answerPositionIndex=first_id)
+
+# ----------- JOBS -----------
+
+job_manager.register(
+    "process-article",
+    lambda payload, progress: process_article_payload(ArticleRequest(**payload), progress)
+)
+
+
+@app.post("/jobs/process-article", status_code=202)
+def submit_process_article_job(request: ArticleRequest):
+    """Same input as /process-article; poll GET /jobs/{jobId} for progress and the AnalysisResponse."""
+    job = job_manager.submit("process-article", request.model_dump())
+    return {"jobId": job["jobId"], "status": job["status"]}
+
+
+@app.get("/jobs/stats")
+def job_stats():
+    return job_manager.stats()
+
+
+@app.get("/admission/stats")
+def admission_stats():
+    """Queue depth, active requests and wait times per lane (interactive / bulk)."""
+    return admission.metrics()
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found (unknown id or past retention)")
+    return FastJSONResponse(job)
+
+
+class RequestBodyStreamingResponse(StreamingResponse):
+    # The generator reads the request body itself, so the disconnect listener that
+    # StreamingResponse runs alongside it must not consume body messages; the generator
+    # watches for the disconnect instead (see process_article_stream)
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
+
+
+@app.post("/process-article/stream")
+async def process_article_stream(
+    request: Request,
+    primaryKeyword: str,
+    maxBytes: Optional[int] = None,
+    maxBlocks: Optional[int] = None,
+    maxSentences: Optional[int] = None,
+    profile: AnalysisProfile = AnalysisProfile.FULL,
+):
+    """Bounded-memory variant of /process-article for multi-megabyte pages. The body is the
+    raw HTML (not JSON); it is parsed as it arrives and results come back as NDJSON, one
+    SentenceOutput per line, then a final {"done": true, ...} summary line."""
+    max_bytes, max_blocks, max_sentences = resolve_limits(maxBytes, maxBlocks, maxSentences)
+    pipeline = PROFILE_PIPELINES[profile]
+
+    async def events():
+        kw_doc = await run_in_threadpool(pipeline, primaryKeyword.lower())
+        state = {"is_keyword_active": True}
+        parser = BlockStreamParser(max_block_chars=pipeline.max_length)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        # Only hashes of processed blocks are kept for the exact-duplicate check
+        processed = set()
+        first_id, s_count, p_count, received = None, 1, 1, 0
+        truncation_reason = None
+        body_read, disconnected = False, False
+
+        async def body_chunks():
+            # request.stream(), but it records when the last body message has arrived
+            nonlocal body_read
+            while not body_read:
+                message = await request.receive()
+                if message["type"] == "http.disconnect":
+                    raise ClientDisconnect()
+                body_read = not message.get("more_body", False)
+                if message.get("body"):
+                    yield message["body"]
+
+        async def client_gone() -> bool:
+            # Until the whole body has arrived a receive() here could swallow a body chunk;
+            # a disconnect during the upload surfaces in body_chunks() instead
+            nonlocal disconnected
+            disconnected = disconnected or (body_read and await request.is_disconnected())
+            return disconnected
+
+        def text_key(text: str) -> bytes:
+            return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+        async def drain():
+            nonlocal first_id, s_count, p_count, truncation_reason
+            for tag, raw_text in parser.pop_blocks():
+                if await client_gone():
+                    return
+                if text_key(raw_text) in processed:
+                    continue
+                text = clean_block_text(tag, raw_text)
+                if not text:
+                    continue
+                if p_count > max_blocks:
+                    truncation_reason = "maxBlocks"
+                    return
+                if s_count > max_sentences:
+                    truncation_reason = "maxSentences"
+                    return
+                block_results, hit_limit = await run_in_threadpool(
+                    analyze_block, text, tag, f"P{p_count}", kw_doc, state, s_count, max_sentences - s_count + 1,
+                    pipeline
+                )
+                for res in block_results:
+                    if res.answerSentenceFlag == 1 and first_id is None:
+                        first_id = res.SentenceId
+                    yield dumps(res.to_dict()) + b"\n"
+                s_count += len(block_results)
+                processed.add(text_key(text))
+                p_count += 1
+                if hit_limit:
+                    truncation_reason = "maxSentences"
+                    return
+
+        try:
+            async for chunk in body_chunks():
+                if received + len(chunk) > max_bytes:
+                    chunk = chunk[:max_bytes - received]
+                    truncation_reason = "maxBytes"
+                received += len(chunk)
+                with span("html"):
+                    parser.feed(decoder.decode(chunk))
+                async for line in drain():
+                    yield line
+                if truncation_reason:
+                    break
+        except ClientDisconnect:
+            return
+        # From here on the body is no longer read, so receive() may be polled for the disconnect
+        body_read = True
+        if truncation_reason in (None, "maxBytes"):
+            # Whatever the byte limit let through is still analyzed
+            parser.feed(decoder.decode(b"", final=True))
+            parser.close()
+            async for line in drain():
+                yield line
+        if disconnected:
+            return
+
+        yield dumps({
+            "done": True,
+            "answerPositionIndex": first_id,
+            "sentenceCount": s_count - 1,
+            "blockCount": p_count - 1,
+            "bytesRead": received,
+            "clippedBlocks": parser.clipped_blocks,
+            "truncated": truncation_reason is not None,
+            "truncationReason": truncation_reason,
+        }) + b"\n"
+
+    return RequestBodyStreamingResponse(events(), media_type="application/x-ndjson")
     
     
 if __name__ == "__main__":
@@ -1,40 +1,142 @@
-from flask import Flask, request, jsonify
-import requests
+import asyncio
 import json
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List
 
-app = Flask(__name__)
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
+from ollama_client import AsyncOllamaClient
+
+# Whole-request budget for /api/categorize, streaming included
+CATEGORIZE_TIMEOUT = float(os.environ.get("CATEGORIZE_TIMEOUT", "120"))
+# How often a non-streaming request checks whether its caller is still connected
+DISCONNECT_POLL_SECONDS = float(os.environ.get("DISCONNECT_POLL_SECONDS", "0.5"))
+
+
+# HEADING_FAST_PATH=1 answers confident headings with the embedding categorizer
+HEADING_FAST_PATH = os.environ.get("HEADING_FAST_PATH", "0") == "1"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One shared async client (connection pool + concurrency limit) per process
+    app.state.client = AsyncOllamaClient()
+    app.state.categorizer = None
+    if HEADING_FAST_PATH:
+        from heading_categorizer import PrototypeHeadingCategorizer, load_encoder
+        categorizer = PrototypeHeadingCategorizer(await asyncio.to_thread(load_encoder))
+        await asyncio.to_thread(categorizer.train_from_cache, app.state.client.cache)
+        app.state.categorizer = categorizer
+        app.state.client.fast_path = categorizer.categorize_confident
+    yield
+    await app.state.client.aclose()
+
+
+app = FastAPI(title="Centauri Heading Categorizer", lifespan=lifespan)
+
+
+class CategorizeRequest(BaseModel):
+    h2_tags: List[str] = []
+    stream: bool = False
+
+
+class ClientDisconnected(Exception):
+    pass
+
+
+async def cancel_on_disconnect(request: Request, coro):
+    """Awaits coro, cancelling it (and the Ollama call behind it) if the caller goes away."""
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+async def ndjson_with_deadline(events: AsyncIterator[dict], timeout: float) -> AsyncIterator[bytes]:
+    """Serializes stream events as NDJSON and ends the stream with an error event on timeout.
+    A caller disconnect cancels this generator, which closes the upstream Ollama stream."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    iterator = events.__aiter__()
+    try:
+        while True:
+            # Awaited in this task (not wait_for's helper task) so aclose() below is always safe
+            try:
+                async with asyncio.timeout_at(deadline):
+                    event = await iterator.__anext__()
+            except StopAsyncIteration:
+                break
+            yield (json.dumps(event) + "\n").encode("utf-8")
+    except asyncio.TimeoutError:
+        yield (json.dumps({"error": f"categorization timed out after {timeout}s"}) + "\n").encode("utf-8")
+    except httpx.HTTPError as e:
+        yield (json.dumps({"error": str(e)}) + "\n").encode("utf-8")
+    finally:
+        await iterator.aclose()
+
+
+@app.post('/api/categorize')
+async def categorize(body: CategorizeRequest, request: Request):
+    h2_list = body.h2_tags
 
-@app.route('/api/categorize', methods=['POST'])
-def categorize():
-    data = request.json
-    h2_list = data.get('h2_tags', [])
-    
     if not h2_list:
-        return jsonify({"error": "No h2_tags provided"}), 400
-
-    # Strict SEO Prompt
-    prompt = f"""
-    Categorize these H2 tags into Header Types (Definition, Process, FAQ, etc.):
-    {", ".join(h2_list)}
-    Return ONLY a JSON object: {{"H2": "Category"}}
-    """
-
-    payload = {
-        "model": "llama3.2",
-        "prompt": prompt,
-        "stream": False,
-        "format": "json"
-    }
+        return JSONResponse({"error": "No h2_tags provided"}, status_code=400)
+
+    client: AsyncOllamaClient = request.app.state.client
+
+    if body.stream:
+        return StreamingResponse(
+            ndjson_with_deadline(client.categorize_stream(h2_list), CATEGORIZE_TIMEOUT),
+            media_type="application/x-ndjson",
+        )
 
     try:
-        response = requests.post(OLLAMA_URL, json=payload)
-        ai_response = response.json().get('response', '{}')
-        return jsonify(json.loads(ai_response))
+        return await cancel_on_disconnect(
+            request, asyncio.wait_for(client.categorize(h2_list), CATEGORIZE_TIMEOUT)
+        )
+    except ClientDisconnected:
+        # Nobody is listening any more; 499 only shows up in our own access logs
+        return Response(status_code=499)
+    except (asyncio.TimeoutError, httpx.TimeoutException):
+        return JSONResponse({"error": f"categorization timed out after {CATEGORIZE_TIMEOUT}s"}, status_code=504)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+
+@app.get('/api/categorize/cache-stats')
+async def cache_stats(request: Request):
+    return request.app.state.client.cache.stats()
+
+
+@app.get('/api/categorize/fast-path')
+async def fast_path_report(request: Request):
+    categorizer = request.app.state.categorizer
+    if categorizer is None:
+        return {"enabled": False}
+    return {"enabled": True, "trained": categorizer.is_trained, **categorizer.report}
+
+
+@app.post('/api/categorize/fast-path/retrain')
+async def fast_path_retrain(request: Request):
+    """Refits the prototypes on everything the LLM has answered so far."""
+    categorizer = request.app.state.categorizer
+    if categorizer is None:
+        return JSONResponse({"error": "Fast path disabled (set HEADING_FAST_PATH=1)"}, status_code=400)
+    report = await asyncio.to_thread(categorizer.train_from_cache, request.app.state.client.cache)
+    return {"enabled": True, "trained": categorizer.is_trained, **report}
+
 
 if __name__ == '__main__':
+    import uvicorn
     # '0.0.0.0' taaki AWS ya local network pe kahin se bhi access ho sake
-    app.run(host='0.0.0.0', port=5000)
\ No newline at end of file
+    uvicorn.run(app, host='0.0.0.0', port=5000)
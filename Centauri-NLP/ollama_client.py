@@ -0,0 +1,352 @@
+import asyncio
+import itertools
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# --- CONFIG (env overridable) ---
+OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://localhost:11434/api/generate")
+OLLAMA_MODEL = os.environ.get("OLLAMA_MODEL", "llama3.2")
+OLLAMA_CONNECT_TIMEOUT = float(os.environ.get("OLLAMA_CONNECT_TIMEOUT", "3"))
+OLLAMA_READ_TIMEOUT = float(os.environ.get("OLLAMA_READ_TIMEOUT", "120"))
+OLLAMA_RETRIES = int(os.environ.get("OLLAMA_RETRIES", "2"))
+# Ollama answers these while loading a model or behind a restarting proxy; both clients retry them
+OLLAMA_RETRY_STATUSES = (502, 503, 504)
+OLLAMA_RETRY_BACKOFF = 0.5
+OLLAMA_POOL_SIZE = int(os.environ.get("OLLAMA_POOL_SIZE", "8"))
+# Max generations in flight toward Ollama from one process (async client)
+OLLAMA_MAX_CONCURRENCY = int(os.environ.get("OLLAMA_MAX_CONCURRENCY", "4"))
+# Max headings coalesced into a single prompt
+CATEGORIZE_BATCH_SIZE = int(os.environ.get("CATEGORIZE_BATCH_SIZE", "40"))
+# The default file sits next to this module whatever the working directory;
+# HEADING_CACHE_PATH="" keeps categorizations in memory only
+HEADING_CACHE_PATH = os.environ.get(
+    "HEADING_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "heading_cache.db")
+)
+HEADING_CACHE_SIZE = int(os.environ.get("HEADING_CACHE_SIZE", "20000"))
+# Seconds a writer waits for another process's transaction on the shared file
+HEADING_CACHE_BUSY_TIMEOUT = float(os.environ.get("HEADING_CACHE_BUSY_TIMEOUT", "30"))
+
+
+def normalize_heading(heading: str) -> str:
+    return re.sub(r"\s+", " ", heading or "").strip().casefold()
+
+
+def build_categorize_prompt(headings: List[str]) -> str:
+    # Headings go in as a JSON array so commas inside a heading cannot split it
+    return f"""
+    Categorize these H2 tags into Header Types (Definition, Process, FAQ, etc.):
+    {json.dumps(headings, ensure_ascii=False)}
+    Return ONLY a JSON object: {{"H2": "Category"}}
+    """
+
+
+def parse_categories(raw: str, headings: List[str]) -> Dict[str, str]:
+    """Maps the model's {"H2": "Category"} answer back onto the requested headings."""
+    try:
+        answer = json.loads(raw or "{}")
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(answer, dict):
+        return {}
+    by_key = {normalize_heading(k): v for k, v in answer.items() if isinstance(v, str) and v.strip()}
+    return {h: by_key[normalize_heading(h)].strip() for h in headings if normalize_heading(h) in by_key}
+
+
+class HeadingCategoryCache:
+    """Heading -> category answers from the LLM; in-memory LRU backed by SQLite."""
+
+    def __init__(self, path: str = HEADING_CACHE_PATH, max_entries: int = HEADING_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "write_errors": 0}
+
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False, timeout=HEADING_CACHE_BUSY_TIMEOUT)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS heading_categories ("
+                "key TEXT PRIMARY KEY, heading TEXT NOT NULL, category TEXT NOT NULL)"
+            )
+            self._db.commit()
+
+    def _remember(self, key: str, category: str):
+        self._memory[key] = category
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, heading: str) -> Optional[str]:
+        key = normalize_heading(heading)
+        with self._lock:
+            category = self._memory.get(key)
+            if category is not None:
+                self._memory.move_to_end(key)
+            elif self._db is not None:
+                try:
+                    row = self._db.execute("SELECT category FROM heading_categories WHERE key = ?", (key,)).fetchone()
+                except sqlite3.OperationalError:
+                    row = None  # still locked after the busy timeout: the heading is simply asked again
+                if row:
+                    category = row[0]
+                    self._remember(key, category)
+            self._stats["hits" if category is not None else "misses"] += 1
+        return category
+
+    def put_many(self, answers: Iterable[Tuple[str, str]]):
+        rows = [(normalize_heading(h), h, c) for h, c in answers]
+        if not rows:
+            return
+        with self._lock:
+            for key, _, category in rows:
+                self._remember(key, category)
+            self._stats["writes"] += len(rows)
+            if self._db is not None:
+                try:
+                    with self._db:
+                        self._db.executemany("INSERT OR REPLACE INTO heading_categories VALUES (?, ?, ?)", rows)
+                except sqlite3.OperationalError:
+                    # The cache is best effort: answers stay in memory, the disk write is dropped
+                    self._stats["write_errors"] += len(rows)
+
+    def items(self) -> List[Tuple[str, str]]:
+        """All cached (heading, category) answers, e.g. as training data."""
+        with self._lock:
+            if self._db is not None:
+                try:
+                    return self._db.execute("SELECT heading, category FROM heading_categories").fetchall()
+                except sqlite3.OperationalError:
+                    pass
+            return list(self._memory.items())
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        return stats
+
+
+def _lookup_cached(cache: HeadingCategoryCache, headings: List[str]) -> Tuple[Dict[str, str], List[str]]:
+    """Splits headings into cached answers (by normalized key) and unique misses."""
+    by_key: Dict[str, str] = {}
+    misses: List[str] = []
+    missed_keys = set()
+    for heading in headings:
+        key = normalize_heading(heading)
+        if not key or key in by_key or key in missed_keys:
+            continue
+        category = cache.get(heading)
+        if category is not None:
+            by_key[key] = category
+        else:
+            misses.append(heading)
+            missed_keys.add(key)
+    return by_key, misses
+
+
+# Optional local categorizer consulted before the LLM; returns only confident answers
+FastPath = Callable[[List[str]], Dict[str, str]]
+
+
+def _apply_fast_path(answers: Dict[str, str], misses: List[str], by_key: Dict[str, str]) -> List[str]:
+    by_key.update((normalize_heading(h), c) for h, c in answers.items())
+    return [h for h in misses if h not in answers]
+
+
+def _in_request_order(headings: List[str], by_key: Dict[str, str]) -> Dict[str, str]:
+    return {h: by_key[normalize_heading(h)] for h in headings if normalize_heading(h) in by_key}
+
+
+class OllamaClient:
+    """Keep-alive, retrying Ollama client with per-heading caching and prompt batching."""
+
+    def __init__(
+        self,
+        url: str = OLLAMA_URL,
+        model: str = OLLAMA_MODEL,
+        connect_timeout: float = OLLAMA_CONNECT_TIMEOUT,
+        read_timeout: float = OLLAMA_READ_TIMEOUT,
+        retries: int = OLLAMA_RETRIES,
+        pool_size: int = OLLAMA_POOL_SIZE,
+        batch_size: int = CATEGORIZE_BATCH_SIZE,
+        cache: Optional[HeadingCategoryCache] = None,
+        fast_path: Optional[FastPath] = None,
+    ):
+        self.url = url
+        self.model = model
+        self.timeout = (connect_timeout, read_timeout)
+        self.batch_size = batch_size
+        self.cache = cache if cache is not None else HeadingCategoryCache()
+        self.fast_path = fast_path
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=OLLAMA_RETRY_STATUSES,
+            allowed_methods=frozenset({"POST"}),
+        )
+        self.session = requests.Session()
+        self.session.mount(url.split("://", 1)[0] + "://", HTTPAdapter(pool_maxsize=pool_size, max_retries=retry))
+
+    def generate(self, prompt: str) -> str:
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": False,
+            "format": "json"
+        }
+        response = self.session.post(self.url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json().get('response', '{}')
+
+    def categorize(self, headings: List[str]) -> Dict[str, str]:
+        by_key, misses = _lookup_cached(self.cache, headings)
+        if self.fast_path and misses:
+            misses = _apply_fast_path(self.fast_path(misses), misses, by_key)
+
+        # Headings that missed the cache share one prompt per batch
+        for start in range(0, len(misses), self.batch_size):
+            batch = misses[start:start + self.batch_size]
+            answers = parse_categories(self.generate(build_categorize_prompt(batch)), batch)
+            self.cache.put_many(answers.items())
+            by_key.update((normalize_heading(h), c) for h, c in answers.items())
+
+        return _in_request_order(headings, by_key)
+
+
+class AsyncOllamaClient:
+    """asyncio counterpart of OllamaClient: one shared httpx.AsyncClient, a bounded
+    number of generations in flight and an optional token stream."""
+
+    def __init__(
+        self,
+        url: str = OLLAMA_URL,
+        model: str = OLLAMA_MODEL,
+        connect_timeout: float = OLLAMA_CONNECT_TIMEOUT,
+        read_timeout: float = OLLAMA_READ_TIMEOUT,
+        retries: int = OLLAMA_RETRIES,
+        pool_size: int = OLLAMA_POOL_SIZE,
+        max_concurrency: int = OLLAMA_MAX_CONCURRENCY,
+        batch_size: int = CATEGORIZE_BATCH_SIZE,
+        cache: Optional[HeadingCategoryCache] = None,
+        fast_path: Optional[FastPath] = None,
+    ):
+        self.url = url
+        self.model = model
+        self.batch_size = batch_size
+        self.cache = cache if cache is not None else HeadingCategoryCache()
+        self.fast_path = fast_path
+        self.retries = retries
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # httpx transport retries cover connection failures only; 502/503/504 are retried in
+        # generate() / stream_generate() with the same backoff as the sync client
+        self._http = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            transport=httpx.AsyncHTTPTransport(retries=retries),
+        )
+
+    def _payload(self, prompt: str, stream: bool) -> dict:
+        return {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": stream,
+            "format": "json"
+        }
+
+    async def _retry_wait(self, response: httpx.Response, attempt: int) -> bool:
+        """Closes the response and sleeps when the status is retryable and attempts are left."""
+        if response.status_code not in OLLAMA_RETRY_STATUSES or attempt >= self.retries:
+            return False
+        await response.aclose()
+        retry_after = response.headers.get("retry-after", "")
+        await asyncio.sleep(float(retry_after) if retry_after.isdigit() else OLLAMA_RETRY_BACKOFF * 2 ** attempt)
+        return True
+
+    async def generate(self, prompt: str) -> str:
+        async with self._semaphore:
+            for attempt in itertools.count():
+                response = await self._http.post(self.url, json=self._payload(prompt, False))
+                if not await self._retry_wait(response, attempt):
+                    break
+            response.raise_for_status()
+            return response.json().get('response', '{}')
+
+    async def stream_generate(self, prompt: str) -> AsyncIterator[str]:
+        """Yields the model's response fragments as Ollama produces them."""
+        async with self._semaphore:
+            for attempt in itertools.count():
+                request = self._http.build_request("POST", self.url, json=self._payload(prompt, True))
+                response = await self._http.send(request, stream=True)
+                if not await self._retry_wait(response, attempt):
+                    break
+            try:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        break
+            finally:
+                await response.aclose()
+
+    async def _fast_path(self, misses: List[str]) -> Dict[str, str]:
+        if not self.fast_path or not misses:
+            return {}
+        # Embedding is CPU-bound; keep it off the event loop
+        return await asyncio.to_thread(self.fast_path, misses)
+
+    async def categorize(self, headings: List[str]) -> Dict[str, str]:
+        # The cache's SQLite reads and commits stay off the event loop
+        by_key, misses = await asyncio.to_thread(_lookup_cached, self.cache, headings)
+        misses = _apply_fast_path(await self._fast_path(misses), misses, by_key)
+        batches = [misses[i:i + self.batch_size] for i in range(0, len(misses), self.batch_size)]
+        # Batches run concurrently; the semaphore caps what actually reaches Ollama
+        raws = await asyncio.gather(*(self.generate(build_categorize_prompt(b)) for b in batches))
+        answers = {}
+        for batch, raw in zip(batches, raws):
+            answers.update(parse_categories(raw, batch))
+        if answers:
+            await asyncio.to_thread(self.cache.put_many, list(answers.items()))
+        by_key.update((normalize_heading(h), c) for h, c in answers.items())
+        return _in_request_order(headings, by_key)
+
+    async def categorize_stream(self, headings: List[str]) -> AsyncIterator[dict]:
+        """Streaming categorize. Events, in order:
+        {"cached": {...}}, {"fast_path": {...}}, {"batch": n, "token": "..."} per model
+        fragment, then {"done": true, "categories": {...}} with the merged answer."""
+        by_key, misses = await asyncio.to_thread(_lookup_cached, self.cache, headings)
+        yield {"cached": _in_request_order(headings, by_key)}
+
+        fast = await self._fast_path(misses)
+        misses = _apply_fast_path(fast, misses, by_key)
+        yield {"fast_path": fast}
+
+        for n, start in enumerate(range(0, len(misses), self.batch_size)):
+            batch = misses[start:start + self.batch_size]
+            parts = []
+            async for token in self.stream_generate(build_categorize_prompt(batch)):
+                parts.append(token)
+                yield {"batch": n, "token": token}
+            answers = parse_categories("".join(parts), batch)
+            await asyncio.to_thread(self.cache.put_many, list(answers.items()))
+            by_key.update((normalize_heading(h), c) for h, c in answers.items())
+
+        yield {"done": True, "categories": _in_request_order(headings, by_key)}
+
+    async def aclose(self):
+        await self._http.aclose()
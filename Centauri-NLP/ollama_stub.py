@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# Minimal stand-in for Ollama's /api/generate, for exercising the categorize client locally.
+# Usage: python ollama_stub.py [port] [delay_seconds]
+#        OLLAMA_URL=http://localhost:11435/api/generate python ollama.py
+# GET /stub-stats returns how many generate calls and headings the stub has served.
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RULES = [
+    (re.compile(r"^(what is|what are|what does|who is|definition)\b|\bmeaning\b", re.I), "Definition"),
+    (re.compile(r"^(how to|how do|how can|steps?\b)|\bprocess\b|\bguide\b", re.I), "Process"),
+    (re.compile(r"\bfaqs?\b|frequently asked", re.I), "FAQ"),
+    (re.compile(r"\bvs\.?\b|\bversus\b|\bcompar", re.I), "Comparison"),
+    (re.compile(r"\b(benefits?|advantages?|why)\b", re.I), "Benefits"),
+]
+
+stats = {"generate_calls": 0, "headings": 0}
+stats_lock = threading.Lock()
+
+
+def categorize_heading(heading):
+    for pattern, category in RULES:
+        if pattern.search(heading):
+            return category
+    return "Informational"
+
+
+def extract_headings(prompt):
+    """Pulls the JSON array of headings out of the categorize prompt."""
+    match = re.search(r"\[.*?\]", prompt, re.S)
+    if not match:
+        return []
+    try:
+        return [h for h in json.loads(match.group(0)) if isinstance(h, str)]
+    except json.JSONDecodeError:
+        return []
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real server
+    delay = 0.0
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/stub-stats":
+            with stats_lock:
+                self._send_json(200, dict(stats))
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/api/generate":
+            self._send_json(404, {"error": "not found"})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        headings = extract_headings(payload.get("prompt", ""))
+        with stats_lock:
+            stats["generate_calls"] += 1
+            stats["headings"] += len(headings)
+
+        answer = json.dumps({h: categorize_heading(h) for h in headings})
+        model = payload.get("model", "stub")
+        if payload.get("stream"):
+            self._stream_answer(model, answer)
+            return
+        if self.delay:
+            time.sleep(self.delay)
+        self._send_json(200, {"model": model, "response": answer, "done": True})
+
+    def _stream_answer(self, model, answer, piece=8):
+        """Sends the answer as Ollama-style NDJSON chunks over chunked transfer encoding;
+        the configured delay is spread across the chunks."""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        pieces = [answer[i:i + piece] for i in range(0, len(answer), piece)] or [""]
+        lines = [{"model": model, "response": p, "done": False} for p in pieces]
+        lines.append({"model": model, "response": "", "done": True})
+        for line in lines:
+            if self.delay:
+                time.sleep(self.delay / len(lines))
+            data = (json.dumps(line) + "\n").encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port=11435, delay=0.0):
+    StubHandler.delay = delay
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    print(f"Ollama stub listening on http://127.0.0.1:{port}/api/generate (delay {delay}s)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 11435
+    delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    serve(port, delay)
@@ -0,0 +1,13 @@
+import numpy as np
+
+# Relevance scores from one float32 matrix product sum in a different order than
+# Doc.similarity's per-doc dot, so they can differ from it in the last float32 bits. Only
+# scores right at a rounding edge of the reported value, or at the answer threshold, can
+# change the output; both services recompute those few with Doc.similarity itself.
+RELEVANCE_DECIMALS = 4
+
+
+def near_rounding_edge(scores: np.ndarray, threshold: float, decimals: int = RELEVANCE_DECIMALS) -> np.ndarray:
+    """Mask of scores that the summation order could round, or compare with threshold, differently."""
+    scaled = np.asarray(scores, dtype=np.float64) * 10 ** decimals
+    return (np.abs(scaled - np.floor(scaled) - 0.5) < 1e-2) | (np.abs(scores - threshold) < 1e-6)
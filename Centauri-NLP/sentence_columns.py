@@ -0,0 +1,101 @@
+import sys
+import threading
+from array import array
+from typing import Any, Dict, Iterator, List, Optional
+
+# Columnar result buffer for one article. Sentence results repeat a handful of label strings
+# ("Declarative", "Active", "ThirdParty", "p", ...) thousands of times; here they are small
+# integer codes in array columns, ids are interned, and every sentence's entities live in
+# one shared list addressed by offsets. SentenceOutput-shaped dicts are only materialized
+# at the response boundary.
+
+CATEGORICAL_FIELDS = (
+    "HtmlTag", "FunctionalType", "InformativeType", "Structure", "Voice",
+    "InfoQuality", "ClaritySynthesisType", "Source",
+)
+FLAG_FIELDS = ("ClaimsCitation", "IsGrammaticallyCorrect", "HasPronoun", "answerSentenceFlag", "entityConfidenceFlag")
+
+
+class _Vocabulary:
+    """Process-wide code table for one categorical field; codes never change once assigned."""
+
+    def __init__(self):
+        self._codes: Dict[Any, int] = {}
+        self.values: List[Any] = []
+        self._lock = threading.Lock()
+
+    def code(self, value) -> int:
+        if value is None:
+            return -1
+        try:
+            return self._codes[value]
+        except KeyError:
+            with self._lock:
+                if value not in self._codes:
+                    self._codes[value] = len(self.values)
+                    self.values.append(sys.intern(value) if type(value) is str else value)
+                return self._codes[value]
+
+    def value(self, code: int):
+        return None if code < 0 else self.values[code]
+
+
+_VOCABULARIES = {field: _Vocabulary() for field in CATEGORICAL_FIELDS}
+
+
+class SentenceColumns:
+    def __init__(self):
+        self.sentence_ids: List[str] = []
+        self.sentences: List[str] = []
+        self.paragraph_ids: List[Optional[str]] = []
+        self.codes = {field: array("h") for field in CATEGORICAL_FIELDS}
+        self.flags = {field: array("b") for field in FLAG_FIELDS}
+        self.relevance = array("d")
+        self.entity_values: List[str] = []
+        self.entity_offsets = array("l", [0])
+
+    def __len__(self) -> int:
+        return len(self.sentences)
+
+    def append(self, record):
+        """record: a SentenceRecord (nlp_service)."""
+        self.sentence_ids.append(sys.intern(record.SentenceId))
+        self.sentences.append(record.Sentence)
+        self.paragraph_ids.append(sys.intern(record.ParagraphId) if record.ParagraphId else record.ParagraphId)
+        for field in CATEGORICAL_FIELDS:
+            self.codes[field].append(_VOCABULARIES[field].code(getattr(record, field)))
+        for field in FLAG_FIELDS:
+            self.flags[field].append(int(getattr(record, field)))
+        self.relevance.append(record.RelevanceScore)
+        self.entity_values.extend(sys.intern(e) for e in record.entities)
+        self.entity_offsets.append(len(self.entity_values))
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def entities(self, i: int) -> List[str]:
+        return self.entity_values[self.entity_offsets[i]:self.entity_offsets[i + 1]]
+
+    def iter_dicts(self) -> Iterator[Dict[str, Any]]:
+        """SentenceOutput-shaped dicts, same key order as SentenceRecord.to_dict()."""
+        labels = {field: [_VOCABULARIES[field].value(c) for c in self.codes[field]] for field in CATEGORICAL_FIELDS}
+        for i in range(len(self)):
+            entities = self.entities(i)
+            yield {
+                "SentenceId": self.sentence_ids[i], "Sentence": self.sentences[i],
+                "HtmlTag": labels["HtmlTag"][i], "ParagraphId": self.paragraph_ids[i],
+                "FunctionalType": labels["FunctionalType"][i], "InformativeType": labels["InformativeType"][i].value,
+                "Structure": labels["Structure"][i], "Voice": labels["Voice"][i], "InfoQuality": labels["InfoQuality"][i],
+                "ClaritySynthesisType": labels["ClaritySynthesisType"][i],
+                "ClaimsCitation": bool(self.flags["ClaimsCitation"][i]),
+                "IsGrammaticallyCorrect": bool(self.flags["IsGrammaticallyCorrect"][i]),
+                "HasPronoun": bool(self.flags["HasPronoun"][i]),
+                "EntityCount": len(entities), "RelevanceScore": self.relevance[i],
+                "answerSentenceFlag": self.flags["answerSentenceFlag"][i],
+                "entityMentionFlag": {"value": 1 if entities else 0, "entity_count": len(entities), "entities": entities},
+                "entityConfidenceFlag": self.flags["entityConfidenceFlag"][i], "Source": labels["Source"][i],
+            }
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return list(self.iter_dicts())
@@ -1,13 +1,27 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict
-import spacy
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import asyncio
+import os
+import numpy as np
 import re
 
-# Model Load
-nlp = spacy.load("en_core_web_lg")
+from model_registry import registry
+from relevance import near_rounding_edge
+
+# Model Load (shared with the other services when mounted together)
+nlp = registry.proxy("en_core_web_lg")
 app = FastAPI(title="SEO Section-Based Analyzer")
 
+# Worker pool for the blocking spaCy stage of /analyze-seo
+NLP_WORKERS = int(os.environ.get("NLP_WORKERS", "4"))
+SECTION_BATCH_SIZE = int(os.environ.get("SECTION_BATCH_SIZE", "64"))
+KEYWORD_CACHE_SIZE = int(os.environ.get("KEYWORD_CACHE_SIZE", "1024"))
+ANSWER_RELEVANCE_THRESHOLD = 0.60
+nlp_executor = ThreadPoolExecutor(max_workers=NLP_WORKERS, thread_name_prefix="seo-nlp")
+
 class ContentItem(BaseModel):
     s_id: int
     text: str
@@ -33,47 +47,78 @@ def identify_source_type_semantic(text_lower, subjects):
     return "Unknown"
 
 def get_logical_sections(content: List[ContentItem]):
-    """Merges consecutive P tags into one block until a new Heading or Section starts."""
-    sections = []
-    current_text = ""
+    """Merges consecutive P tags into one block until a new Heading or Section starts.
+    Yields each section as soon as it closes; text parts are joined once per section."""
+    current_parts = []
     current_tags = []
     current_ids = []
 
     for item in content:
         # Agar naya Heading tag aaye toh pichla section close karo [cite: 1, 12, 37]
-        if item.tag.startswith('h') and current_text:
-            sections.append({"text": current_text.strip(), "tag": current_tags[0], "ids": current_ids})
-            current_text = ""
+        if item.tag.startswith('h') and current_parts:
+            yield {"text": " ".join(current_parts).strip(), "tag": current_tags[0], "ids": current_ids}
+            current_parts = []
             current_ids = []
             current_tags = []
 
-        current_text += " " + item.text
+        current_parts.append(item.text)
         current_tags.append(item.tag)
         current_ids.append(item.s_id)
 
-    if current_text:
-        sections.append({"text": current_text.strip(), "tag": current_tags[0], "ids": current_ids})
-    return sections
+    if current_parts:
+        yield {"text": " ".join(current_parts).strip(), "tag": current_tags[0], "ids": current_ids}
 
-@app.post("/analyze-seo")
-async def analyze_seo(request: AnalysisRequest):
-    keyword_doc = nlp(request.keyword)
-    sections = get_logical_sections(request.content)
+@lru_cache(maxsize=KEYWORD_CACHE_SIZE)
+def keyword_unit_vector(keyword: str):
+    """Parses a keyword once and caches its Doc and unit-length vector."""
+    keyword_doc = nlp(keyword)
+    if not keyword_doc.vector_norm:
+        return keyword_doc, None
+    return keyword_doc, keyword_doc.vector / keyword_doc.vector_norm
+
+def section_relevance(docs, keyword: str) -> np.ndarray:
+    """doc.similarity(keyword_doc) for every section with one matrix-vector product."""
+    keyword_doc, keyword_unit = keyword_unit_vector(keyword)
+    if not docs or keyword_unit is None:
+        return np.zeros(len(docs))
+
+    norms = np.array([doc.vector_norm for doc in docs], dtype="float32")
+    vectors = np.stack([doc.vector for doc in docs])
+    safe_norms = np.where(norms > 0, norms, 1.0)
+    # float64 so the Doc.similarity values written below are not rounded back to float32
+    scores = ((vectors / safe_norms[:, None]) @ keyword_unit).astype(np.float64)
+    scores[norms == 0] = 0.0
+
+    # Same near-edge recompute as nlp_service.keyword_relevance, so both services report
+    # the values Doc.similarity gives
+    for i in np.nonzero(near_rounding_edge(scores, ANSWER_RELEVANCE_THRESHOLD) & (norms > 0))[0]:
+        scores[i] = docs[i].similarity(keyword_doc)
+    # Doc.similarity short-cuts identical token sequences to exactly 1.0
+    keyword_orths = tuple(t.orth for t in keyword_doc)
+    for i, doc in enumerate(docs):
+        if len(doc) == len(keyword_orths) and tuple(t.orth for t in doc) == keyword_orths:
+            scores[i] = 1.0
+    return scores
+
+def analyze_sections(keyword: str, content: List[ContentItem]):
+    """Blocking part of /analyze-seo: parses all sections with nlp.pipe and scores them."""
+    sections = list(get_logical_sections(content))
+    docs = list(nlp.pipe((sec['text'] for sec in sections), batch_size=SECTION_BATCH_SIZE))
+    relevances = section_relevance(docs, keyword)
     final_results = []
     first_answer_idx = -1
 
-    for idx, sec in enumerate(sections):
-        doc = nlp(sec['text'])
+    for idx, (sec, doc, relevance) in enumerate(zip(sections, docs, relevances)):
         text_lower = sec['text'].lower()
         subjects = [t.text.lower() for t in doc if "subj" in t.dep_]
         
         # Relevance & Source
-        relevance = doc.similarity(keyword_doc) if doc.vector_norm else 0
+        relevance = float(relevance)
         source = identify_source_type_semantic(text_lower, subjects)
         
         # Intent: Definition/Fact recognition [cite: 17, 28, 45]
         is_answer = 0
-        if relevance > 0.60 and not text_lower.endswith('?'):
+        if relevance > ANSWER_RELEVANCE_THRESHOLD and not text_lower.endswith('?'):
             is_answer = 1
             if first_answer_idx == -1: first_answer_idx = idx
 
@@ -86,6 +131,16 @@ async def analyze_seo(request: AnalysisRequest):
             "is_answer": is_answer
         })
 
+    return final_results, first_answer_idx
+
+@app.post("/analyze-seo")
+async def analyze_seo(request: AnalysisRequest):
+    # spaCy is blocking; run it on the worker pool so the event loop keeps serving other calls
+    loop = asyncio.get_running_loop()
+    final_results, first_answer_idx = await loop.run_in_executor(
+        nlp_executor, analyze_sections, request.keyword, request.content
+    )
+
     # Answer Block Density Calculation
     base_density = 0.0
     if first_answer_idx != -1:
@@ -99,4 +154,4 @@ async def analyze_seo(request: AnalysisRequest):
         "answer_block_density_score": round(base_density * 3, 2),
         "total_sections_analyzed": len(final_results),
         "results": final_results
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,51 @@
+from boilerplate import BOILERPLATE_SITE_MIN_PAGES, BoilerplateDetector, SiteFingerprintStore, band_keys, minhash
+
+SITE = "example.com"
+FOOTER = ("Sign up for our weekly newsletter to get the latest tax filing tips, deadline reminders "
+          "and product updates delivered straight to your inbox every Monday morning")
+FOOTER_VARIANT = FOOTER.replace("Monday morning", "Monday afternoon")
+CONTENT = ("Form 1099-NEC is used to report payments of six hundred dollars or more "
+           "to independent contractors during the tax year")
+
+
+def site_store_with(text):
+    """In-memory store where text has already been seen on enough other pages of SITE."""
+    store = SiteFingerprintStore(path="")
+    signature = minhash(text)
+    for page in range(BOILERPLATE_SITE_MIN_PAGES):
+        match = store.match(SITE, signature, band_keys(signature))
+        store.record_many(SITE, f"https://{SITE}/other-{page}", [(signature, band_keys(signature), match and match[0])])
+    return store
+
+
+def plan(detector, texts):
+    """Paragraph ids the way plan_article assigns them: only kept blocks are numbered."""
+    kept, skipped = [], []
+    for text in texts:
+        p_id = f"P{len(kept) + 1}"
+        match = detector.check(text, p_id)
+        if match:
+            skipped.append(match)
+        else:
+            kept.append(p_id)
+    return kept, skipped
+
+
+def test_site_boilerplate_block_never_becomes_a_match_target():
+    detector = BoilerplateDetector(SITE, f"https://{SITE}/article", site_store=site_store_with(FOOTER))
+
+    kept, skipped = plan(detector, [FOOTER, CONTENT, FOOTER_VARIANT])
+
+    assert kept == ["P1"]
+    assert [m["scope"] for m in skipped] == ["site", "site"]
+    assert all(m["matchedBlockId"] is None for m in skipped)
+
+
+def test_article_match_points_at_a_kept_block():
+    detector = BoilerplateDetector(SITE, f"https://{SITE}/article", site_store=site_store_with(FOOTER))
+
+    kept, skipped = plan(detector, [FOOTER, CONTENT, CONTENT + " again"])
+
+    assert kept == ["P1"]
+    assert skipped[1]["scope"] == "article"
+    assert skipped[1]["matchedBlockId"] in kept
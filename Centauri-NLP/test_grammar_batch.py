@@ -0,0 +1,48 @@
+import queue
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("language_tool_python")
+import app  # noqa: E402  (starts the LanguageTool pool)
+
+ERROR = "This are"
+TEXTS = [
+    # Twelve extra UTF-16 units push an unconverted offset past the end of this sentence
+    "Launch day " + "\U0001F680" * 12 + " went well, but " + ERROR + ".",
+    "The weather was calm all week.",
+    "The team shipped the release on time.",
+]
+
+
+class FakeTool:
+    """Flags every "This are", at UTF-16 offsets like the LanguageTool server, or at
+    code-point offsets like language_tool_python releases that convert them."""
+
+    def __init__(self, utf16: bool):
+        self.utf16 = utf16
+
+    def check(self, text):
+        matches, start = [], text.find(ERROR)
+        while start >= 0:
+            offset = len(text[:start].encode("utf-16-le")) // 2 if self.utf16 else start
+            matches.append(SimpleNamespace(ruleId="AGREEMENT", offset=offset, errorLength=len(ERROR)))
+            start = text.find(ERROR, start + 1)
+        return matches
+
+
+@pytest.mark.parametrize("utf16", [True, False])
+def test_emoji_does_not_shift_matches_to_other_sentences(monkeypatch, utf16):
+    tools = queue.Queue()
+    tools.put(FakeTool(utf16))
+    monkeypatch.setattr(app, "_free_grammar_tools", tools)
+    monkeypatch.setattr(app, "grammar_pool", [None])
+
+    assert app.check_grammar_batch(TEXTS, use_cache=False) == [False, True, True]
+
+
+def test_batch_matches_single_sentence_checks_with_emoji():
+    texts = ["\U0001F600" * 30 + " " + ERROR + " wrong.", "The weather is nice today."]
+    expected = [app.detect_grammar(t, use_cache=False) for t in texts]
+
+    assert app.check_grammar_batch(texts, use_cache=False) == expected
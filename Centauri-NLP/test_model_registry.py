@@ -0,0 +1,60 @@
+# Memory budget behaviour of the model registry, with stub loaders (no real models needed)
+#   python -m pytest test_model_registry.py
+from model_registry import ModelRegistry
+
+
+class StubModel:
+    max_length = 1000000
+
+    def __call__(self, text):
+        return text
+
+    def pipe(self, texts):
+        yield from texts
+
+
+def budget_registry():
+    registry = ModelRegistry(memory_budget_mb=1500)
+    registry.register("languagetool", StubModel, size_mb=700)
+    registry.register("en_core_web_lg", StubModel, size_mb=900)
+    registry.register("en_core_web_sm", StubModel, size_mb=60)
+    return registry
+
+
+def loads(registry, name):
+    return registry.stats()["models"][name]["loads"]
+
+
+def test_over_budget_model_in_use_is_not_reloaded():
+    registry = budget_registry()
+    registry.acquire("languagetool")  # pinned
+    nlp = registry.proxy("en_core_web_lg")
+    for _ in range(5):
+        nlp("x")
+    assert nlp.max_length == 1000000
+    assert list(nlp.pipe(["a", "b"])) == ["a", "b"]
+    assert loads(registry, "en_core_web_lg") == 1
+    assert loads(registry, "languagetool") == 1
+
+
+def test_release_and_get_never_unload():
+    registry = budget_registry()
+    registry.acquire("languagetool")
+    registry.acquire("en_core_web_lg")  # 1600 MB, over budget but both pinned
+    registry.release("en_core_web_lg")
+    registry.get("en_core_web_lg")
+    assert registry.stats()["models"]["en_core_web_lg"]["loaded"]
+    assert registry.stats()["loaded_mb"] == 1600
+
+
+def test_loading_evicts_least_recently_used_idle_model():
+    registry = budget_registry()
+    with registry.use("en_core_web_lg"):
+        pass
+    with registry.use("en_core_web_sm"):
+        pass
+    with registry.use("languagetool"):
+        models = registry.stats()["models"]
+        assert not models["en_core_web_lg"]["loaded"]
+        assert models["en_core_web_sm"]["loaded"]
+    assert registry.stats()["loaded_mb"] == 760
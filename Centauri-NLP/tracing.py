@@ -0,0 +1,144 @@
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Per-request stage timings. The C# API sends its CorrelationId header; it is kept for the
+# whole request (contextvars follow run_in_threadpool), echoed on the response, and spans
+# recorded with span("stage") are summed per stage into a Server-Timing header:
+#   Server-Timing: html;dur=3.1, spacy;dur=412.7, detectors;dur=95.0, serialize;dur=4.2, total;dur=521.3
+# Streaming responses send headers before the work, so their Server-Timing covers only
+# what ran before the first byte; the timing log line always has the full breakdown.
+CORRELATION_HEADERS = ("correlationid", "x-correlation-id", "x-request-id", "requestid")
+RESPONSE_CORRELATION_HEADER = b"CorrelationId"
+# Share of requests written to the timing log (one JSON line per request); 0 disables it
+TRACE_LOG_SAMPLE_RATE = float(os.environ.get("TRACE_LOG_SAMPLE_RATE", "0.01"))
+
+
+class Trace:
+    __slots__ = ("correlation_id", "started", "spans", "_lock")
+
+    def __init__(self, correlation_id: str):
+        self.correlation_id = correlation_id
+        self.started = time.perf_counter()
+        # stage -> [total ms, count]
+        self.spans: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, ms: float):
+        with self._lock:
+            stage = self.spans.setdefault(name, [0.0, 0])
+            stage[0] += ms
+            stage[1] += 1
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self) -> str:
+        with self._lock:
+            parts = [f"{name};dur={ms:.1f}" for name, (ms, _) in self.spans.items()]
+        parts.append(f"total;dur={self.elapsed_ms():.1f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[Trace]] = ContextVar("centauri_trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+
+def correlation_id() -> Optional[str]:
+    trace = _current.get()
+    return trace.correlation_id if trace else None
+
+
+@contextmanager
+def span(name: str):
+    """Adds the block's wall time to the current request's stage; a no-op outside a request."""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, (time.perf_counter() - start) * 1000)
+
+
+def timed_iter(name: str, iterable: Iterable) -> Iterator:
+    """Charges the time spent producing each item (e.g. inside nlp.pipe) to a stage."""
+    trace = _current.get()
+    if trace is None:
+        yield from iterable
+        return
+    iterator = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            trace.add(name, (time.perf_counter() - start) * 1000)
+            return
+        trace.add(name, (time.perf_counter() - start) * 1000)
+        yield item
+
+
+class TracingMiddleware:
+    """ASGI middleware: one Trace per HTTP request, CorrelationId + Server-Timing response
+    headers, and a sampled JSON timing log line when the response completes."""
+
+    def __init__(self, app, sample_rate: float = TRACE_LOG_SAMPLE_RATE):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = None
+        for key, value in scope["headers"]:
+            if key.decode("latin-1").lower() in CORRELATION_HEADERS and value:
+                incoming = value.decode("latin-1")
+                break
+        trace = Trace(incoming or uuid.uuid4().hex)
+        token = _current.set(trace)
+        status = None
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((RESPONSE_CORRELATION_HEADER, trace.correlation_id.encode("latin-1")))
+                headers.append((b"Server-Timing", trace.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            if self.sample_rate and random.random() < self.sample_rate:
+                self.log(scope, status, trace)
+
+    @staticmethod
+    def log(scope, status: Optional[int], trace: Trace):
+        with trace._lock:
+            spans = {name: {"ms": round(ms, 2), "count": count} for name, (ms, count) in trace.spans.items()}
+        print(json.dumps({
+            "event": "request_timing",
+            "correlationId": trace.correlation_id,
+            "method": scope.get("method"),
+            "path": scope.get("path"),
+            "status": status,
+            "totalMs": round(trace.elapsed_ms(), 2),
+            "spans": spans,
+        }), flush=True)
@@ -1125,6 +1125,10 @@ public class SeoController : ControllerBase
         }
     }
 
+    // Busy (503) responses from the local LLP service retried before giving up
+    private const int MaxLocalLlpBusyRetries = 2;
+    private static readonly TimeSpan MaxLocalLlpBusyWait = TimeSpan.FromSeconds(5);
+
     private async Task<AiIndexinglevelLocalLlmResponse> GetFullSentenceTaggingFromLocalLLP(string primaryKeyword, string htmlContent)
     {
         const string provider = "SeoController:GetFullSentenceTaggingFromLocalLLP";
@@ -1156,21 +1160,49 @@ public class SeoController : ControllerBase
 
             using (var client = new HttpClient { Timeout = TimeSpan.FromSeconds(30) })
             {
-                var content = new StringContent(inputData, System.Text.Encoding.UTF8, "application/json");
-                var response = await client.PostAsync(apiUrl, content);
-
-                if (!response.IsSuccessStatusCode)
+                // Lets the NLP service tag its timing logs with the same id as this request
+                var correlationId = _httpContextAccessor?.HttpContext?.Items["CorrelationId"]?.ToString();
+                if (!string.IsNullOrEmpty(correlationId))
+                    client.DefaultRequestHeaders.Add("CorrelationId", correlationId);
+                // User-facing analysis: the NLP service's admission control runs it in the interactive lane
+                client.DefaultRequestHeaders.Add("X-Priority", "interactive");
+
+                HttpResponseMessage response;
+                for (var attempt = 0; ; attempt++)
                 {
-                    string errorContent = await response.Content.ReadAsStringAsync();
-                    throw new LlmApiException(
-                        "Local LLP service returned error",
-                        provider,
-                        (int?)response.StatusCode,
-                        errorContent
-                    );
+                    using (var content = new StringContent(inputData, System.Text.Encoding.UTF8, "application/json"))
+                    {
+                        response = await client.PostAsync(apiUrl, content);
+                    }
+                    if (response.StatusCode != System.Net.HttpStatusCode.ServiceUnavailable)
+                        break;
+
+                    // 503 = the service's queue is full; wait as long as Retry-After asks if that is short.
+                    // The busy response is disposed first so its connection goes back to the pool.
+                    var retryAfter = response.Headers.RetryAfter?.Delta ?? TimeSpan.FromSeconds(1);
+                    response.Dispose();
+                    if (attempt >= MaxLocalLlpBusyRetries || retryAfter > MaxLocalLlpBusyWait)
+                        throw new LlmRateLimitException("Local LLP service is busy", provider, retryAfter);
+                    _llmLogger.LogDebug($"Local LLP service busy, retrying in {retryAfter.TotalSeconds}s | Keyword: {primaryKeyword}");
+                    await Task.Delay(retryAfter);
                 }
 
-                var res = await response.Content.ReadAsStringAsync();
+                string res;
+                using (response)
+                {
+                    if (!response.IsSuccessStatusCode)
+                    {
+                        string errorContent = await response.Content.ReadAsStringAsync();
+                        throw new LlmApiException(
+                            "Local LLP service returned error",
+                            provider,
+                            (int?)response.StatusCode,
+                            errorContent
+                        );
+                    }
+
+                    res = await response.Content.ReadAsStringAsync();
+                }
                 if (string.IsNullOrWhiteSpace(res))
                 {
                     throw new LlmOperationException("Local LLP returned empty response", provider, primaryKeyword);